@@ -0,0 +1,266 @@
+import os
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from storage import columnar
+
+# CONSTANTS
+FREQS = ("daily", "monthly", "fiscal_year")
+FISCAL_YEAR_START_MONTH = 7  # Pakistan's fiscal year runs July-June; FY2021 = Jul 2020 - Jun 2021
+
+PBS_COLUMNS = ['Solar_Gen_GWh', 'Solar_Cap_MW', 'Total_Utilization_Pct', 'Solar_Gen_Share_Pct']
+
+CLEANED_FILES = {
+    "stocks": "cleaned_stocks.csv",
+    "pbs": "cleaned_pbs.csv",
+    "solar_generation": "cleaned_solar_generation.csv",
+    "youtube": "cleaned_youtube_deduped.csv",
+}
+
+def load_cleaned(names: list[str] | None = None, cleaned_dir: str | None = None) -> dict[str, pd.DataFrame]:
+    """Reads the cleaned datasets that exist, with their time columns parsed.
+
+    A dataset whose Parquet copy in ``data/columnar`` was ingested from the
+    current CSV is read from there (typed, no text parsing); otherwise the
+    CSV is parsed.
+    """
+    cleaned_dir = cleaned_dir or Config.CLEANED_DATA_DIR
+    frames = {}
+    for name in names or CLEANED_FILES:
+        path = os.path.join(cleaned_dir, CLEANED_FILES[name])
+        if not os.path.exists(path):
+            continue
+        dataset = os.path.splitext(CLEANED_FILES[name])[0]
+        if os.path.abspath(cleaned_dir) == os.path.abspath(Config.CLEANED_DATA_DIR) and columnar.is_current(dataset):
+            frames[name] = columnar.read_dataset(dataset)
+            continue
+        df = pd.read_csv(path)
+        for col in ('Date', 'Published_At'):
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], utc=(col == 'Published_At'), format="ISO8601")
+        frames[name] = df
+    return frames
+
+def _naive(dates) -> pd.DatetimeIndex:
+    dt = pd.DatetimeIndex(dates)
+    return dt.tz_convert(None) if dt.tz is not None else dt
+
+def fiscal_year_of(dates) -> np.ndarray:
+    """Closing fiscal year of each date, matching the PBS ``Fiscal_Year`` convention."""
+    dt = _naive(dates)
+    return dt.year.to_numpy() + (dt.month.to_numpy() >= FISCAL_YEAR_START_MONTH)
+
+def period_codes(dates, freq: str) -> np.ndarray:
+    """Integer period of each date: days since epoch, ``year * 12 + month - 1`` or fiscal year."""
+    dt = _naive(dates)
+    if freq == "daily":
+        return dt.to_numpy().astype("datetime64[D]").astype(np.int64)
+    if freq == "monthly":
+        return dt.year.to_numpy() * 12 + dt.month.to_numpy() - 1
+    if freq == "fiscal_year":
+        return fiscal_year_of(dt)
+    raise ValueError(f"freq must be one of {FREQS}")
+
+def period_labels(codes: np.ndarray, freq: str) -> pd.Index:
+    """Index labels for period codes: dates, month ends, or fiscal years as ints."""
+    if freq == "daily":
+        return pd.DatetimeIndex(codes.astype("datetime64[D]"), name="Date")
+    if freq == "monthly":
+        starts = pd.to_datetime({"year": codes // 12, "month": codes % 12 + 1, "day": 1})
+        return pd.DatetimeIndex(starts + pd.offsets.MonthEnd(0), name="Date")
+    return pd.Index(codes, name="Fiscal_Year")
+
+def _reduce(keys: np.ndarray, values: np.ndarray, size: int, how: str) -> np.ndarray:
+    """Groups ``values`` by integer ``keys`` in ``[0, size)``; empty groups are NaN (0 for count)."""
+    valid = ~np.isnan(values)
+    keys, values = keys[valid], values[valid]
+    counts = np.bincount(keys, minlength=size)
+    if how == "count":
+        return counts.astype(np.float64)
+    if how == "last":
+        # keys arrive in time order; the last row of each run after a stable sort wins
+        order = np.argsort(keys, kind="stable")
+        k = keys[order]
+        last = np.r_[k[1:] != k[:-1], True]
+        out = np.full(size, np.nan)
+        out[k[last]] = values[order][last]
+        return out
+    sums = np.bincount(keys, weights=values, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = sums / counts if how == "mean" else sums
+    return np.where(counts > 0, out, np.nan)
+
+def align_panel(
+    frames: dict[str, pd.DataFrame],
+    freq: str = "monthly",
+    stock_field: str = "Close",
+    pbs_columns: list[str] = PBS_COLUMNS,
+    ffill_prices: bool = True,
+) -> pd.DataFrame:
+    """Puts every cleaned series on one contiguous calendar in a single pass per dataset.
+
+    ``frames`` is what load_cleaned returns (any subset). Columns are:
+
+    - one per ticker: the period's last ``stock_field`` (forward-filled over
+      periods without trading when ``ffill_prices``, but only between the
+      ticker's first and last observation),
+    - ``Solar_Gen_GWh``: generation summed over the period,
+    - ``Comment_Volume``: distinct YouTube comments published in the period
+      (near-duplicates counted once; 0 if none),
+    - ``PBS_<col>``: annual PBS values, repeated across each fiscal year.
+
+    Tickers are scattered into a (period x ticker) matrix with one grouped
+    reduction, so the cost grows linearly with rows and tickers.
+    """
+    if freq not in FREQS:
+        raise ValueError(f"freq must be one of {FREQS}")
+
+    dated = {
+        "stocks": ("Date", frames.get("stocks")),
+        "solar_generation": ("Date", frames.get("solar_generation")),
+        "youtube": ("Published_At", frames.get("youtube")),
+    }
+    codes = {name: period_codes(df[col], freq) for name, (col, df) in dated.items() if df is not None and len(df)}
+    pbs = frames.get("pbs")
+    if not codes and (pbs is None or freq != "fiscal_year"):
+        return pd.DataFrame()
+
+    all_codes = np.concatenate(list(codes.values()) or [pbs['Fiscal_Year'].to_numpy()])
+    first, last = int(all_codes.min()), int(all_codes.max())
+    n_periods = last - first + 1
+    index = period_labels(np.arange(first, last + 1), freq)
+    columns = {}
+
+    if "stocks" in codes:
+        stocks = frames["stocks"]
+        order = np.argsort(stocks['Date'].to_numpy(), kind="stable")
+        tickers, ticker_idx = np.unique(stocks['Ticker'].to_numpy()[order], return_inverse=True)
+        keys = (codes["stocks"][order] - first) * len(tickers) + ticker_idx
+        values = stocks[stock_field].to_numpy(dtype=np.float64)[order]
+        wide = _reduce(keys, values, n_periods * len(tickers), "last").reshape(n_periods, len(tickers))
+        prices = pd.DataFrame(wide, index=index, columns=tickers)
+        if ffill_prices:
+            # Past a ticker's last trade there is no price to carry, only fake zero returns
+            prices = prices.ffill(limit_area="inside")
+        columns.update(prices.items())
+
+    if "solar_generation" in codes:
+        gen = frames["solar_generation"]['Solar_Gen_GWh'].to_numpy(dtype=np.float64)
+        columns['Solar_Gen_GWh'] = pd.Series(_reduce(codes["solar_generation"] - first, gen, n_periods, "sum"), index)
+
+    if "youtube" in codes:
+        ones = np.ones(len(codes["youtube"]))
+        columns['Comment_Volume'] = pd.Series(_reduce(codes["youtube"] - first, ones, n_periods, "count"), index)
+
+    if pbs is not None and len(pbs):
+        fy = index.to_numpy() if freq == "fiscal_year" else fiscal_year_of(index)
+        by_year = pbs.drop_duplicates('Fiscal_Year').set_index('Fiscal_Year')
+        for col in pbs_columns:
+            if col in by_year.columns:
+                columns[f"PBS_{col}"] = pd.Series(by_year[col].reindex(fy).to_numpy(dtype=np.float64), index)
+
+    return pd.DataFrame(columns, index=index)
+
+def rebase(panel: pd.DataFrame, base: float = 100.0) -> pd.DataFrame:
+    """Each column divided by its first non-missing value (the notebook's ``pivot_df / pivot_df.iloc[0]``)."""
+    values = panel.to_numpy(dtype=np.float64)
+    has = ~np.isnan(values)
+    first_row = np.where(has.any(axis=0), has.argmax(axis=0), 0)
+    first = values[first_row, np.arange(values.shape[1])]
+    return pd.DataFrame(values / first * base, index=panel.index, columns=panel.columns)
+
+def returns(panel: pd.DataFrame, periods: int = 1, log: bool = False) -> pd.DataFrame:
+    """Rolling ``periods``-step returns of every column as one array expression."""
+    values = panel.to_numpy(dtype=np.float64)
+    out = np.full_like(values, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = values[periods:] / values[:-periods]
+        out[periods:] = np.log(ratio) if log else ratio - 1
+    return pd.DataFrame(out, index=panel.index, columns=panel.columns)
+
+def _window_sum(a: np.ndarray, window: int) -> np.ndarray:
+    """Trailing ``window``-row sums along axis 0; the first ``window - 1`` rows are NaN."""
+    out = np.full(a.shape, np.nan)
+    if window > len(a):
+        return out
+    c = np.cumsum(a, axis=0)
+    out[window - 1] = c[window - 1]
+    out[window:] = c[window:] - c[:-window]
+    return out
+
+def rolling_corr(x: np.ndarray, Y: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    """Trailing-window Pearson correlation of ``x`` (T,) with every column of ``Y`` (T, K).
+
+    Uses pairwise-complete observations; windows with fewer than
+    ``min_periods`` (default: ``window``) pairs are NaN. Six cumulative sums
+    replace the per-window loop.
+    """
+    min_periods = min_periods or window
+    Y = Y.reshape(len(Y), -1)
+    valid = ~np.isnan(Y) & ~np.isnan(x)[:, None]
+    x0 = np.where(valid, x[:, None], 0.0)
+    y0 = np.where(valid, Y, 0.0)
+
+    n = _window_sum(valid.astype(np.float64), window)
+    sx, sy = _window_sum(x0, window), _window_sum(y0, window)
+    sxy, sxx, syy = _window_sum(x0 * y0, window), _window_sum(x0 * x0, window), _window_sum(y0 * y0, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~(var > 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+def pairwise_corr(A: np.ndarray, B: np.ndarray, min_periods: int = 3) -> np.ndarray:
+    """Pearson correlation of every column of ``A`` (T, K) with every column of ``B`` (T, L).
+
+    Missing values are excluded pair by pair, as in ``DataFrame.corr``, but all
+    K x L coefficients come from six matrix products.
+    """
+    ma, mb = (~np.isnan(A)).astype(np.float64), (~np.isnan(B)).astype(np.float64)
+    a0, b0 = np.nan_to_num(A), np.nan_to_num(B)
+
+    n = ma.T @ mb
+    sa, sb = a0.T @ mb, ma.T @ b0
+    sab = a0.T @ b0
+    saa, sbb = (a0 * a0).T @ mb, ma.T @ (b0 * b0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sab - sa * sb / n
+        var = (saa - sa * sa / n) * (sbb - sb * sb / n)
+        corr = cov / np.sqrt(var)
+    corr[(n < min_periods) | ~(var > 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+def _lagged(y: np.ndarray, lags: np.ndarray) -> np.ndarray:
+    """(T, len(lags)) matrix whose column j is ``y`` delayed by ``lags[j]`` rows (NaN padded)."""
+    rows = np.arange(len(y))[:, None] - lags[None, :]
+    inside = (rows >= 0) & (rows < len(y))
+    return np.where(inside, y[np.clip(rows, 0, len(y) - 1)], np.nan)
+
+def rolling_correlations(panel: pd.DataFrame, x_cols: list[str], y_cols: list[str], window: int) -> pd.DataFrame:
+    """Rolling correlation of each ``x_cols`` series with every ``y_cols`` series.
+
+    Columns are a (x, y) MultiIndex, e.g. ``("Comment_Volume", "HUBC.KA")``.
+    """
+    Y = panel[y_cols].to_numpy(dtype=np.float64)
+    blocks = [rolling_corr(panel[x].to_numpy(dtype=np.float64), Y, window) for x in x_cols]
+    columns = pd.MultiIndex.from_product([x_cols, y_cols], names=["x", "y"])
+    return pd.DataFrame(np.hstack(blocks), index=panel.index, columns=columns)
+
+def lagged_correlations(
+    panel: pd.DataFrame, x_cols: list[str], y_cols: list[str], max_lag: int, min_periods: int = 3
+) -> pd.DataFrame:
+    """Correlation of ``y[t]`` with ``x[t - lag]`` for lag in ``[-max_lag, max_lag]``.
+
+    A positive lag means the x series leads. Rows are lags, columns a
+    (x, y) MultiIndex; each x needs one (T, 2 * max_lag + 1) shifted matrix
+    and a single pairwise_corr against all y columns.
+    """
+    lags = np.arange(-max_lag, max_lag + 1)
+    Y = panel[y_cols].to_numpy(dtype=np.float64)
+    blocks = [
+        pairwise_corr(_lagged(panel[x].to_numpy(dtype=np.float64), lags), Y, min_periods)
+        for x in x_cols
+    ]
+    columns = pd.MultiIndex.from_product([x_cols, y_cols], names=["x", "y"])
+    return pd.DataFrame(np.hstack(blocks), index=pd.Index(lags, name="lag"), columns=columns)
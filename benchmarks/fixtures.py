@@ -0,0 +1,425 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import hashlib
+import threading
+from collections import Counter
+from contextlib import contextmanager, redirect_stdout
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from types import ModuleType
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from extractload import api_cache, quota
+from extractload.comment_store import append_video_threads
+from transform.pbs import PBS_TABLES, PROVINCES
+
+# CONSTANTS
+FIXTURE_VERSION, SEED = 2, 1729
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".fixtures")
+
+# Per-unit-of-scale sizes of the generated datasets
+RADIATION_YEARS, STOCK_TICKERS, COMMENT_VIDEOS = 1, 10, 20
+COMMENT_PAGES, THREADS_PER_PAGE, REPLY_SHARE, REPLIES_PER_THREAD = 3, 100, 0.3, 2
+SPAM_SHARE = 0.05
+
+WORDS = [
+    "solar", "panel", "price", "pakistan", "net", "metering", "battery", "inverter", "bill", "wapda",
+    "lahore", "karachi", "load", "shedding", "install", "grid", "units", "summer", "rates", "tax",
+]
+SPAM = [
+    "Contact me on WhatsApp +92 300 1234567 for best solar deals 🔥🔥",
+    "Subscribe to my channel for solar tips!!",
+    "&quot;Great video&quot; &amp; very informative 👍",
+]
+
+def _rng(*key) -> random.Random:
+    """Deterministic generator per fixture item, independent of generation order."""
+    digest = hashlib.sha256(repr((SEED,) + key).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+def _comment_text(rng: random.Random) -> str:
+    if rng.random() < SPAM_SHARE:
+        return rng.choice(SPAM)
+    return " ".join(rng.choices(WORDS, k=rng.randint(3, 30)))
+
+class _FakeRequest:
+    def __init__(self, owner: "FakeYouTube", method_id: str, build):
+        self.methodId, self._owner, self._build = method_id, owner, build
+
+    def execute(self) -> dict:
+        self._owner.count(self.methodId)
+        if self._owner.latency:
+            time.sleep(self._owner.latency)
+        return self._build()
+
+class _FakeCollection:
+    def __init__(self, owner: "FakeYouTube", name: str):
+        self._owner, self._name = owner, name
+
+    def list(self, **params) -> _FakeRequest:
+        build = getattr(self._owner, f"_{self._name}_page")
+        return _FakeRequest(self._owner, f"youtube.{self._name}.list", lambda: build(**params))
+
+class FakeYouTube:
+    """Offline stand-in for ``googleapiclient.discovery.build("youtube", "v3")``.
+
+    Supports the ``search``, ``channels``, ``videos``, ``commentThreads`` and
+    ``comments`` list calls the extractors make, with deterministic payloads,
+    ``latency`` seconds per ``execute()`` and configurable page counts.
+    ``calls`` counts executed requests per API method.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        comment_pages: int = COMMENT_PAGES,
+        threads_per_page: int = THREADS_PER_PAGE,
+        reply_share: float = REPLY_SHARE,
+        replies_per_thread: int = REPLIES_PER_THREAD,
+        search_pages: int = 2,
+        match_share: float = 0.5,
+        match_decay: float = 0.5,
+    ):
+        self.latency = latency
+        self.comment_pages, self.threads_per_page = comment_pages, threads_per_page
+        self.reply_share, self.replies_per_thread = reply_share, replies_per_thread
+        self.search_pages, self.match_share, self.match_decay = search_pages, match_share, match_decay
+        self.calls = Counter()
+        self._lock = threading.Lock()
+
+    def count(self, method_id: str) -> None:
+        with self._lock:
+            self.calls[method_id] += 1
+
+    def search(self) -> _FakeCollection: return _FakeCollection(self, "search")
+    def channels(self) -> _FakeCollection: return _FakeCollection(self, "channels")
+    def videos(self) -> _FakeCollection: return _FakeCollection(self, "videos")
+    def commentThreads(self) -> _FakeCollection: return _FakeCollection(self, "commentThreads")
+    def comments(self) -> _FakeCollection: return _FakeCollection(self, "comments")
+
+    @staticmethod
+    def _page(params: dict) -> int:
+        return int(params.get("pageToken") or 0)
+
+    def _next(self, page: int, pages: int) -> dict:
+        return {"nextPageToken": str(page + 1)} if page + 1 < pages else {}
+
+    def _search_page(self, **params) -> dict:
+        if params.get("type") == "channel":
+            return {"items": [{"id": {"channelId": f"UC{params.get('q', '')}"}}]}
+        page, n = self._page(params), min(params.get("maxResults", 50), 50)  # the API caps pages at 50
+        scope = (params.get("channelId") or params.get("q", ""), params.get("publishedAfter"))
+        # Relevance ordering: later pages match the title filters less often
+        share = self.match_share * self.match_decay ** page
+        items = []
+        for i in range(n):
+            rng = _rng("search", scope, page, i)
+            keyword = "Pakistan Solar" if rng.random() < share else "Budget"
+            items.append({
+                "id": {"kind": "youtube#video", "videoId": f"v{rng.getrandbits(40):010x}"},
+                "snippet": {"title": f"{keyword} update {page}-{i}", "publishedAt": "2025-01-01T00:00:00Z"},
+            })
+        return {"items": items, **self._next(page, self.search_pages)}
+
+    def _channels_page(self, **params) -> dict:
+        handle = params.get("forHandle") or params.get("forUsername") or ""
+        return {"items": [{"id": f"UC{handle}"}]}
+
+    def _videos_page(self, **params) -> dict:
+        items = []
+        for video_id in params.get("id", "").split(","):
+            rng = _rng("video", video_id)
+            items.append({
+                "id": video_id,
+                "snippet": {"title": f"Solar video {video_id}"},
+                "statistics": {"viewCount": str(rng.randint(0, 50_000)), "commentCount": str(rng.randint(0, 500))},
+            })
+        return {"items": items}
+
+    def _comment(self, comment_id: str, rng: random.Random, published: pd.Timestamp) -> dict:
+        return {
+            "id": comment_id,
+            "snippet": {
+                "textDisplay": _comment_text(rng),
+                "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "likeCount": rng.randint(0, 50),
+            },
+        }
+
+    def _commentThreads_page(self, **params) -> dict:
+        video_id, page = params["videoId"], self._page(params)
+        return {"items": self.thread_page(video_id, page), **self._next(page, self.comment_pages)}
+
+    def _comments_page(self, **params) -> dict:
+        parent, rng = params["parentId"], _rng("replies", params["parentId"])
+        base = pd.Timestamp("2025-06-01") + pd.Timedelta(minutes=rng.randint(0, 10**5))
+        replies = [
+            self._comment(f"{parent}.r{i}", rng, base + pd.Timedelta(minutes=i))
+            for i in range(self.replies_per_thread)
+        ]
+        return {"items": replies}
+
+    def thread_page(self, video_id: str, page: int) -> list[dict]:
+        """One ``commentThreads.list`` page, newest threads first."""
+        items = []
+        for i in range(self.threads_per_page):
+            rng = _rng("thread", video_id, page, i)
+            published = pd.Timestamp("2025-06-01") - pd.Timedelta(minutes=page * self.threads_per_page + i)
+            replies = self.replies_per_thread if rng.random() < self.reply_share else 0
+            items.append({
+                "id": f"{video_id}.{page}.{i}",
+                "snippet": {
+                    "topLevelComment": self._comment(f"{video_id}.{page}.{i}", rng, published),
+                    "totalReplyCount": replies,
+                },
+            })
+        return items
+
+    def video_threads(self, video_id: str) -> list[dict]:
+        """Every thread of a video with ``fetched_replies`` attached, as the extractors store them."""
+        threads = []
+        for page in range(self.comment_pages):
+            for item in self.thread_page(video_id, page):
+                if item["snippet"]["totalReplyCount"]:
+                    item["fetched_replies"] = self._comments_page(parentId=item["snippet"]["topLevelComment"]["id"])["items"]
+                threads.append(item)
+        return threads
+
+def fake_yfinance(latency: float = 0.0) -> ModuleType:
+    """Module exposing a ``download()`` shaped like yfinance's: (Price, Ticker) column levels, business days."""
+    module = ModuleType("yfinance")
+
+    def download(tickers, start=None, end=None, interval="1d", group_by="column", progress=True, threads=True, **_):
+        if latency:
+            time.sleep(latency)
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        dates = pd.bdate_range(start or "2018-01-01", end or pd.Timestamp.today(), inclusive="left", name="Date")
+        frames = {}
+        for ticker in tickers:
+            rng = np.random.default_rng(int.from_bytes(hashlib.sha256(ticker.encode()).digest()[:4], "big"))
+            # Random walk from a per-ticker origin so any date range is reproducible
+            origin = (dates - pd.Timestamp("2000-01-03")).days.to_numpy()
+            close = 100 * np.exp(0.0002 * origin + 0.1 * np.sin(origin / 90 + rng.uniform(0, 6)))
+            spread = close * rng.uniform(0.005, 0.03, len(dates))
+            frames[ticker] = pd.DataFrame({
+                "Close": close,
+                "High": close + spread,
+                "Low": close - spread,
+                "Open": close + rng.uniform(-1, 1, len(dates)) * spread,
+                "Volume": rng.integers(10_000, 5_000_000, len(dates)),
+            }, index=dates)
+        df = pd.concat(frames, axis=1, names=["Ticker", "Price"]).swaplevel(axis=1)
+        return df[["Close", "High", "Low", "Open", "Volume"]] if len(df.columns) else df
+
+    module.download = download
+    return module
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static files with what download_file relies on: ETag/Last-Modified, If-None-Match, Range/If-Range and 416."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        st = os.stat(path)
+        etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        start, requested = 0, self.headers.get("Range", "")
+        if requested.startswith("bytes=") and self.headers.get("If-Range", etag) == etag:
+            start = int(requested[len("bytes="):].split("-", 1)[0])
+            if start >= st.st_size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{st.st_size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{st.st_size - 1}/{st.st_size}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", self.date_time_string(int(st.st_mtime)))
+        self.send_header("Content-Length", str(st.st_size - start))
+        self.end_headers()
+        with open(path, "rb") as f:
+            f.seek(start)
+            shutil.copyfileobj(f, self.wfile)
+
+@contextmanager
+def file_server(root: str):
+    """Serves ``root`` on a free localhost port with RangeRequestHandler; yields the base URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RangeRequestHandler, directory=root))
+    thread = threading.Thread(target=server.serve_forever, name="fixture-http", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@contextmanager
+def installed_module(name: str, module: ModuleType):
+    """Makes ``import name`` return ``module`` for the duration of the block."""
+    previous = sys.modules.get(name)
+    sys.modules[name] = module
+    try:
+        yield module
+    finally:
+        if previous is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = previous
+
+@contextmanager
+def sandbox(root: str):
+    """Points Config's data directories, the quota scheduler and the response cache at ``root``.
+
+    The scheduler has an unlimited budget and no state file, so benchmarks
+    neither spend nor read the real daily quota.
+    """
+    dirs = {"RAW_DATA_DIR": "raw", "PROCESSED_DATA_DIR": "processed", "CLEANED_DATA_DIR": "cleaned",
+            "COLUMNAR_DATA_DIR": "columnar", "QUARANTINE_DATA_DIR": "quarantine"}
+    saved = {name: getattr(Config, name) for name in dirs}
+    saved_scheduler, saved_cache = quota._default_scheduler, api_cache._default_cache
+    for name, sub_dir in dirs.items():
+        setattr(Config, name, os.path.join(root, sub_dir))
+    Config.ensure_directories()
+    quota._default_scheduler = quota.QuotaScheduler(daily_budget=10**12, state_path=None)
+    api_cache._default_cache = api_cache.ResponseCache(os.path.join(root, api_cache.CACHE_FILE))
+    try:
+        yield root
+    finally:
+        api_cache._default_cache.close()
+        for name, value in saved.items():
+            setattr(Config, name, value)
+        quota._default_scheduler, api_cache._default_cache = saved_scheduler, saved_cache
+
+def synthetic_tickers(scale: int) -> list[str]:
+    extra = [f"SYN{i:03d}.KA" for i in range(STOCK_TICKERS * scale - len(Config.TICKERS))]
+    return Config.TICKERS[:STOCK_TICKERS * scale] + extra
+
+def write_radiation_csv(path: str, years: int, seed: int = SEED) -> int:
+    """One city's 10-minute readings in the Kaggle layout, written a year at a time."""
+    rng = np.random.default_rng(seed)
+    rows = 0
+    for year in range(years):
+        time_index = pd.date_range(f"{2000 + year}-01-01", f"{2001 + year}-01-01", freq="10min", inclusive="left")
+        hour = time_index.hour.to_numpy() + time_index.minute.to_numpy() / 60
+        daylight = np.clip(np.sin((hour - 6) / 12 * np.pi), 0, None)
+        season = 1 + 0.3 * np.sin((time_index.dayofyear.to_numpy() - 80) / 365 * 2 * np.pi)
+        n = len(time_index)
+        ghi = 900 * daylight * season * rng.uniform(0.6, 1.0, n) + rng.normal(0, 2, n)
+        df = pd.DataFrame({
+            "time": time_index.strftime("%Y-%m-%d %H:%M:%S"),
+            "ghi_pyr": ghi.round(2),
+            "dni": (ghi * 0.8).round(2),
+            "dhi": (ghi * 0.2).round(2),
+            "air_temperature": (18 + 12 * season * daylight + rng.normal(0, 1.5, n)).round(2),
+            "relative_humidity": np.clip(60 - 25 * daylight + rng.normal(0, 8, n), 5, 100).round(2),
+            "wind_speed": rng.gamma(2, 1.2, n).round(2),
+        })
+        # Sensor gaps, as in the raw data
+        for col in ("ghi_pyr", "air_temperature", "relative_humidity"):
+            df.loc[rng.random(n) < 0.002, col] = np.nan
+        df.to_csv(path, mode="a" if year else "w", header=not year, index=False)
+        rows += n
+    return rows
+
+def write_comment_store(path: str, videos: int, client: FakeYouTube | None = None) -> int:
+    """Raw comments JSONL with ``videos`` videos of FakeYouTube threads; returns the thread count."""
+    client = client or FakeYouTube()
+    threads = 0
+    for v in range(videos):
+        video_id = f"vid{v:06d}"
+        video_threads = client.video_threads(video_id)
+        append_video_threads(path, video_id, f"Solar video {v}", video_threads)
+        threads += len(video_threads)
+    return threads
+
+def write_pbs_tables(pbs_dir: str, years: int) -> None:
+    """PBS CSVs with the hand-extracted templates' columns over ``years`` fiscal years."""
+    rng = np.random.default_rng(SEED)
+    first = 2007 - years
+    labels = [f"{y}-{(y + 1) % 100:02d}" for y in range(first, first + years)]
+    # Capacity leaves room for the generation, so utilization stays under 100% as in the real tables
+    cap = pd.DataFrame({"Year": range(first + 1, first + years + 1),
+                        "Solar": rng.integers(0, 1_000, years), "Total": rng.integers(45_000, 60_000, years)})
+    gen = pd.DataFrame({"Year": labels})
+    for col in ["Nuclear", "Hydel", "Thermal", "Bagasse", "Wind"]:
+        gen[col] = rng.integers(0, 60_000, years)
+    gen["Solar"] = (cap["Solar"] * 8.76 * rng.uniform(0.1, 0.25, years)).round().astype(int)
+    gen["Grand Total"] = gen.iloc[:, 1:].sum(axis=1).map("{:,}".format)
+    gva = pd.DataFrame({"Year": labels, "GVA (at current price)": rng.integers(10**4, 10**6, years).astype(str),
+                        "Subsidy": rng.integers(10**4, 10**6, years).astype(str)})
+    prov = pd.concat([
+        pd.DataFrame({"Year": labels, "Source\\State": source, **{p: rng.integers(0, 40_000, years) for p in PROVINCES}})
+        for source in ("Overall", "Solar", "Hydel")
+    ], ignore_index=True)
+    os.makedirs(pbs_dir, exist_ok=True)
+    for key, df in {"gen": gen, "cap": cap, "gva": gva, "prov": prov}.items():
+        df.to_csv(os.path.join(pbs_dir, PBS_TABLES[key]), index=False)
+
+def write_solar_generation(path: str, months: int) -> None:
+    rng = np.random.default_rng(SEED)
+    dates = pd.date_range("2015-07-31", periods=months, freq="ME")
+    values = np.round(10 + np.arange(months) * 0.5 + rng.normal(0, 2, months), 2).astype(object)
+    values[rng.random(months) < 0.02] = "NA"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.DataFrame({"Observation Date": dates.strftime("%Y-%m-%d"), "Observation Value": values}).to_csv(path, index=False)
+
+def build_fixtures(scale: int, root: str = FIXTURE_DIR) -> str:
+    """Generates (once) the raw inputs of every transform at ``scale`` and returns their ``data/raw`` root.
+
+    The layout mirrors ``Config.RAW_DATA_DIR``/``PROCESSED_DATA_DIR`` so the
+    transforms' own path helpers find the files. Fixtures are reused while
+    FIXTURE_VERSION and the scale match.
+    """
+    from extractload.extract_stocks import extract_stock_data
+    from transform.pbs import pbs_table_paths
+    from transform.solar_generation import solar_generation_file
+    from transform.solar_radiation import radiation_file
+
+    fixture_root = os.path.join(root, f"v{FIXTURE_VERSION}-x{scale}")
+    done_file = os.path.join(fixture_root, "fixtures.json")
+    if os.path.exists(done_file):
+        return fixture_root
+
+    started = time.perf_counter()
+    print(f"Generating {scale}x fixtures in {fixture_root}...")
+    with sandbox(fixture_root):
+        raw_dir = Config.RAW_DATA_DIR
+        radiation_rows = 0
+        for i, city in enumerate(Config.CITIES):
+            path = radiation_file(city, raw_dir)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            radiation_rows += write_radiation_csv(path, RADIATION_YEARS * scale, seed=SEED + i)
+
+        with installed_module("yfinance", fake_yfinance()), open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            extract_stock_data(synthetic_tickers(scale), start="2018-01-01", end="2025-01-01", incremental=True)
+
+        comments_dir = os.path.join(raw_dir, "yt_comments")
+        os.makedirs(comments_dir, exist_ok=True)
+        threads = write_comment_store(os.path.join(comments_dir, "matched_comments.jsonl"), COMMENT_VIDEOS * scale)
+        write_pbs_tables(os.path.dirname(pbs_table_paths()["gen"]), 15 * scale)
+        write_solar_generation(solar_generation_file(raw_dir), 120 * scale)
+
+    summary = {"scale": scale, "radiation_rows": radiation_rows, "comment_threads": threads,
+               "seconds": round(time.perf_counter() - started, 1)}
+    with open(done_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f)
+    print(f"Fixtures ready: {summary}")
+    return fixture_root
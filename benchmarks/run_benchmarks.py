@@ -0,0 +1,387 @@
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from benchmarks.fixtures import (
+    FakeYouTube,
+    build_fixtures,
+    fake_yfinance,
+    file_server,
+    installed_module,
+    sandbox,
+    synthetic_tickers,
+)
+
+# CONSTANTS
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.jsonl")
+DEFAULT_SCALES, DEFAULT_REPEAT, REGRESSION_TOLERANCE = (1, 10), 3, 0.25
+MIN_REGRESSION_SECONDS = 0.05  # slowdowns smaller than this are timer noise
+DOWNLOAD_MB = 8
+
+@dataclass
+class Benchmark:
+    """``setup(scale, latency)`` prepares untimed state; ``run(state)`` is timed and returns items processed."""
+    name: str
+    setup: object
+    run: object
+    unit: str
+
+def _no_state(scale, latency):
+    return None
+
+# EXTRACT
+def _comments_setup(scale, latency):
+    return FakeYouTube(latency=latency, comment_pages=5 * scale), "vid000000"
+
+def _comments_run(state):
+    from extractload.extract_google import fetch_all_comments_raw
+    yt, video_id = state
+    threads = fetch_all_comments_raw(yt, video_id)
+    return len(threads) + sum(len(t.get("fetched_replies", [])) for t in threads)
+
+def _videos_setup(scale, latency):
+    videos = [(f"vid{i:06d}", f"Solar video {i}") for i in range(500 * scale)]
+    return FakeYouTube(latency=latency), videos
+
+def _videos_run(state):
+    from extractload.api_cache import get_response_cache
+    from extractload.extract_google import filter_videos_by_stats
+    yt, videos = state
+    get_response_cache()._conn.execute("DELETE FROM responses")  # time cold lookups, not cache hits
+    filter_videos_by_stats(yt, videos)
+    return len(videos)
+
+def _stocks_setup(scale, latency, incremental=False):
+    shutil.rmtree(os.path.join(Config.RAW_DATA_DIR, "yahoo_finance"), ignore_errors=True)
+    return synthetic_tickers(scale), fake_yfinance(latency), incremental
+
+def _stocks_run(state):
+    from extractload.extract_stocks import extract_stock_data
+    tickers, module, incremental = state
+    with installed_module("yfinance", module):
+        extract_stock_data(tickers, start="2018-01-01", end="2025-01-01", incremental=incremental)
+    return len(tickers)
+
+def _download_setup(scale, latency):
+    root = os.path.join(Config.RAW_DATA_DIR, "download_bench")
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(os.path.join(root, "served"))
+    with open(os.path.join(root, "served", "payload.bin"), "wb") as f:
+        f.write(np.random.default_rng(scale).bytes(DOWNLOAD_MB * scale * 2**20))
+    return root
+
+def _download_run(root):
+    """Fresh download, revalidation, resume of a half .part, then a complete .part the server answers with 416.
+
+    Raises if any step returns the wrong outcome or the final file differs
+    from the served one, so the run doubles as a check of download_file.
+    """
+    from extractload.downloads import download_file, file_sha256
+    source, target = os.path.join(root, "served", "payload.bin"), os.path.join(root, "payload.bin")
+    size = os.path.getsize(source)
+
+    def interrupted_at(offset, validators):
+        os.remove(target)
+        os.remove(target + ".meta.json")
+        with open(source, "rb") as src, open(target + ".part", "wb") as dst:
+            dst.write(src.read(offset))
+        with open(target + ".part.meta.json", "w", encoding="utf-8") as f:
+            json.dump(validators, f)
+
+    with file_server(os.path.join(root, "served")) as base_url:
+        url = f"{base_url}/payload.bin"
+        outcomes = [download_file(url, target), download_file(url, target)]
+        with open(target + ".meta.json", "r", encoding="utf-8") as f:
+            validators = {k: v for k, v in json.load(f).items() if k in ("url", "etag", "last_modified")}
+        interrupted_at(size // 2, validators)
+        outcomes.append(download_file(url, target))
+        interrupted_at(size, validators)
+        outcomes.append(download_file(url, target))
+
+    expected = ["downloaded", "not_modified", "downloaded", "downloaded"]
+    if outcomes != expected or os.path.exists(target + ".part") or file_sha256(target) != file_sha256(source):
+        raise RuntimeError(f"download_file returned {outcomes}, expected {expected} and an identical file")
+    return round(2.5 * size / 2**20)
+
+# TRANSFORM
+def _raw_stocks():
+    from transform.stocks import load_raw_stocks
+    return load_raw_stocks()
+
+def _raw_weather():
+    from transform.solar_radiation import load_raw_weather
+    return load_raw_weather()
+
+def _raw_youtube():
+    from transform.youtube import load_raw_youtube
+    return load_raw_youtube()
+
+def _raw_pbs():
+    from transform.pbs import load_raw_pbs
+    return load_raw_pbs()
+
+def _raw_solar_generation():
+    from transform.solar_generation import load_raw_solar_generation
+    return load_raw_solar_generation()
+
+def _loaded(load):
+    """Setup handing the step the raw frame ``load()`` returns."""
+    return lambda scale, latency: load()
+
+def _timed_load(load):
+    """Run timing the loader itself."""
+    return lambda state: len(load())
+
+def _clean_stocks(df):
+    from transform.stocks import clean_stocks
+    clean_stocks(df)
+    return len(df)
+
+def _clean_weather(df):
+    from transform.solar_radiation import clean_weather
+    clean_weather(df)
+    return len(df)
+
+def _aggregate_weather_setup(scale, latency):
+    from transform.solar_radiation import clean_weather
+    return clean_weather(_raw_weather())
+
+def _aggregate_weather(df):
+    from transform.solar_radiation import aggregate_weather
+    aggregate_weather(df)
+    return len(df)
+
+def _fixture_radiation_rows(scale, latency):
+    with open(os.path.join(os.path.dirname(Config.RAW_DATA_DIR), "fixtures.json"), "r", encoding="utf-8") as f:
+        return json.load(f)["radiation_rows"]
+
+def _aggregate_solar_radiation(rows):
+    from transform.solar_radiation import aggregate_solar_radiation
+    # One process, so the peak-memory reading covers the actual work
+    aggregate_solar_radiation(output_path="", max_workers=1)
+    return rows
+
+def _clean_youtube(df):
+    from transform.youtube import clean_youtube
+    clean_youtube(df)
+    return len(df)
+
+def _dedupe_comments(df):
+    from transform.comments import dedupe_comments
+    dedupe_comments(df)
+    return len(df)
+
+def _clean_pbs(raw):
+    from transform.pbs import clean_pbs
+    clean_pbs(raw["gen"], raw["cap"], raw["gva"], raw["prov"])
+    return len(raw["gen"])
+
+def _clean_solar_generation(df):
+    from transform.solar_generation import clean_solar_generation
+    clean_solar_generation(df)
+    return len(df)
+
+def _validate_stocks_setup(scale, latency):
+    from transform.stocks import clean_stocks
+    return clean_stocks(_raw_stocks())
+
+def _validate_stocks(df):
+    from transform.validation import DATASET_RULES, validate
+    validate(df, DATASET_RULES["stocks"])
+    return len(df)
+
+BENCHMARKS = [
+    Benchmark("extract.fetch_all_comments_raw", _comments_setup, _comments_run, "comments"),
+    Benchmark("extract.filter_videos_by_stats", _videos_setup, _videos_run, "videos"),
+    Benchmark("extract.extract_stock_data", _stocks_setup, _stocks_run, "tickers"),
+    Benchmark("extract.extract_stock_data_incremental", lambda scale, latency: _stocks_setup(scale, latency, True),
+              _stocks_run, "tickers"),
+    Benchmark("extract.download_file", _download_setup, _download_run, "MB"),
+    Benchmark("stocks.load_raw_stocks", _no_state, _timed_load(_raw_stocks), "rows"),
+    Benchmark("stocks.clean_stocks", _loaded(_raw_stocks), _clean_stocks, "rows"),
+    Benchmark("stocks.validate", _validate_stocks_setup, _validate_stocks, "rows"),
+    Benchmark("weather.load_raw_weather", _no_state, _timed_load(_raw_weather), "rows"),
+    Benchmark("weather.clean_weather", _loaded(_raw_weather), _clean_weather, "rows"),
+    Benchmark("weather.aggregate_weather", _aggregate_weather_setup, _aggregate_weather, "rows"),
+    Benchmark("weather.aggregate_solar_radiation", _fixture_radiation_rows, _aggregate_solar_radiation, "rows"),
+    Benchmark("youtube.load_raw_youtube", _no_state, _timed_load(_raw_youtube), "comments"),
+    Benchmark("youtube.clean_youtube", _loaded(_raw_youtube), _clean_youtube, "comments"),
+    Benchmark("youtube.dedupe_comments", _loaded(_raw_youtube), _dedupe_comments, "comments"),
+    Benchmark("pbs.clean_pbs", _loaded(_raw_pbs), _clean_pbs, "years"),
+    Benchmark("solar_generation.clean_solar_generation", _loaded(_raw_solar_generation), _clean_solar_generation, "rows"),
+]
+
+def _git(*args: str) -> str:
+    try:
+        out = subprocess.run(["git", *args], cwd=Config.BASE_DIR, capture_output=True, text=True, timeout=30)
+        return out.stdout.strip() if out.returncode == 0 else ""
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+def environment() -> dict:
+    """Commit and library versions stored with every result."""
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or "unknown",
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+def measure(bench: Benchmark, scale: int, repeat: int, latency: float) -> dict:
+    """Best/mean wall time over ``repeat`` runs, then one extra run under tracemalloc for peak memory.
+
+    Output printed by the code under test is discarded. Peak memory counts
+    Python and NumPy allocations in this process only.
+    """
+    times, items = [], 0
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            state = bench.setup(scale, latency)
+            gc.collect()
+            started = time.perf_counter()
+            items = bench.run(state)
+            times.append(time.perf_counter() - started)
+            del state
+
+        state = bench.setup(scale, latency)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            bench.run(state)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "benchmark": bench.name,
+        "scale": scale,
+        "items": items,
+        "unit": bench.unit,
+        "seconds": round(best, 4),
+        "mean_seconds": round(sum(times) / len(times), 4),
+        "throughput": round(items / best, 1) if best > 0 else None,
+        "peak_mb": round(peak / 2**20, 2),
+        "repeat": repeat,
+        "latency": latency,
+    }
+
+def load_results(path: str = RESULTS_FILE) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def save_results(results: list[dict], path: str = RESULTS_FILE) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+
+def baseline_for(result: dict, history: list[dict], baseline: str | None = None) -> dict | None:
+    """Latest stored result of the same benchmark, scale and latency from another commit (or ``baseline``)."""
+    for old in reversed(history):
+        if (old["benchmark"], old["scale"], old.get("latency")) != (result["benchmark"], result["scale"], result["latency"]):
+            continue
+        if baseline is not None and old["commit"].startswith(baseline):
+            return old
+        if baseline is None and (old["commit"] != result["commit"] or old.get("dirty") != result.get("dirty")):
+            return old
+    return None
+
+def report(results: list[dict], history: list[dict], baseline: str | None, tolerance: float) -> list[dict]:
+    """Prints one line per result with its change against the baseline; returns the regressions."""
+    regressions = []
+    print(f"{'benchmark':<44} {'scale':>5} {'items':>9} {'best s':>9} {'items/s':>11} {'peak MB':>9}  vs baseline")
+    for result in results:
+        old = baseline_for(result, history, baseline)
+        change = ""
+        if old:
+            ratio = result["seconds"] / old["seconds"] if old["seconds"] else 1.0
+            change = f"{ratio - 1:+.0%} time, {result['peak_mb'] - old['peak_mb']:+.1f} MB ({old['commit']})"
+            if ratio > 1 + tolerance and result["seconds"] - old["seconds"] > MIN_REGRESSION_SECONDS:
+                change += "  REGRESSION"
+                regressions.append(result)
+        throughput = f"{result['throughput']:,.0f}" if result["throughput"] else "-"
+        print(f"{result['benchmark']:<44} {result['scale']:>4}x {result['items']:>9,} {result['seconds']:>9.3f} "
+              f"{throughput:>11} {result['peak_mb']:>9.1f}  {change}")
+    return regressions
+
+def _selected(only: list[str] | None) -> list[Benchmark]:
+    if not only:
+        return BENCHMARKS
+    names = [name.strip() for value in only for name in value.split(",") if name.strip()]
+    selected = [b for b in BENCHMARKS if any(b.name == n or b.name.startswith(n + ".") for n in names)]
+    unknown = [n for n in names if not any(b.name == n or b.name.startswith(n + ".") for b in BENCHMARKS)]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)}")
+    return selected
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the extract and transform steps.")
+    parser.add_argument("--only", action="append", metavar="NAME",
+                        help="Benchmarks or groups to run, e.g. --only weather,extract.extract_stock_data.")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES),
+                        help="Fixture scales; 100 needs several GB of RAM and disk (default: 1 10).")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per benchmark.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds the fake APIs sleep per call.")
+    parser.add_argument("--results", default=RESULTS_FILE, help="JSONL history the results are appended to.")
+    parser.add_argument("--baseline", default=None, metavar="COMMIT",
+                        help="Compare against this commit instead of the latest other one.")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="Slowdown ratio above which a result is a regression (default: 0.25).")
+    parser.add_argument("--no-save", action="store_true", help="Do not append the results to the history.")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit.")
+    args = parser.parse_args(argv)
+    try:
+        args.benchmarks = _selected(args.only)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    if args.list:
+        for bench in BENCHMARKS:
+            print(f"{bench.name:<44} per {bench.unit}")
+        return 0
+
+    env, history, results = environment(), load_results(args.results), []
+    stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    print(f"--- BENCHMARKS @ {env['commit']}{' (dirty)' if env['dirty'] else ''} ---")
+    for scale in args.scales:
+        fixture_root = build_fixtures(scale)
+        with tempfile.TemporaryDirectory() as work_dir:
+            # Inputs are read from the fixtures; anything a step writes goes to a scratch copy
+            shutil.copytree(fixture_root, work_dir, dirs_exist_ok=True)
+            with sandbox(work_dir):
+                for bench in args.benchmarks:
+                    result = measure(bench, scale, args.repeat, args.latency)
+                    result.update(env, timestamp=stamp)
+                    results.append(result)
+                    print(f"[bench] {bench.name} {scale}x: {result['seconds']:.3f}s")
+
+    print("--- RESULTS ---")
+    regressions = report(results, history, args.baseline, args.tolerance)
+    if not args.no_save:
+        save_results(results, args.results)
+        print(f"Saved {len(results)} results to {args.results}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,23 +1,50 @@
 import os
-from dotenv import load_dotenv
+import threading
 
-load_dotenv()
+_dotenv_lock = threading.Lock()
+_dotenv_loaded = False
+
+def _load_env() -> None:
+    """Reads .env into the environment once, the first time a setting needs it."""
+    global _dotenv_loaded
+    with _dotenv_lock:
+        if not _dotenv_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _dotenv_loaded = True
+
+class EnvSetting:
+    """Class attribute resolved from the environment (and .env) on first access.
+
+    Importing Config therefore has no side effects; a missing required
+    setting only raises when the stage that needs it reads it.
+    """
+
+    def __init__(self, name: str, default: str | None = None, cast=str, required: bool = False):
+        self.name, self.default, self.cast, self.required = name, default, cast, required
+
+    def __get__(self, obj, owner=None):
+        _load_env()
+        value = os.getenv(self.name, self.default)
+        if self.required and not value:
+            raise ValueError(f"Set {self.name} in .env")
+        return self.cast(value) if value is not None else None
 
 class Config:
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     RAW_DATA_DIR = os.path.join(BASE_DIR, 'data', 'raw')
     PROCESSED_DATA_DIR = os.path.join(BASE_DIR, 'data', 'processed')
     CLEANED_DATA_DIR = os.path.join(BASE_DIR, 'data', 'cleaned')
+    COLUMNAR_DATA_DIR = os.path.join(BASE_DIR, 'data', 'columnar')
+    QUARANTINE_DATA_DIR = os.path.join(BASE_DIR, 'data', 'quarantine')
 
     PDF_URL = "https://www.pbs.gov.pk/wp-content/uploads/2020/07/Trends_in_Electricity_Generation_2006-07_to_2020-21.pdf"
 
-    YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-    if not YOUTUBE_API_KEY:
-        raise ValueError("Set YOUTUBE_API_KEY in .env")
+    YOUTUBE_API_KEY = EnvSetting("YOUTUBE_API_KEY", required=True)
+
+    KAGGLE_API_TOKEN = EnvSetting("KAGGLE_API_TOKEN", required=True)
 
-    KAGGLE_API_TOKEN = os.getenv('KAGGLE_API_TOKEN')
-    if not KAGGLE_API_TOKEN:
-        raise ValueError("Set KAGGLE_API_TOKEN in .env")
+    YOUTUBE_DAILY_QUOTA = EnvSetting("YOUTUBE_DAILY_QUOTA", "10000", cast=int)
 
     CHANNELS = ["https://www.youtube.com/@dawnnewsenglish", "https://www.youtube.com/@Samaatv", "https://www.youtube.com/@BOLNewsofficial", 
                 "https://www.youtube.com/ArynewsTvofficial", "https://www.youtube.com/@DunyanewsOfficial", 
@@ -26,6 +53,8 @@ class Config:
     
     KEYWORDS = ["Solar"]
 
+    CITIES = ['lahore', 'karachi', 'islamabad', 'peshawar']
+
     TICKERS = ['HUBC.KA', 'PAEL.KA', 'OGDC.KA', 'PPL.KA', 'MARI.KA', 'ENGRO.KA', 'PSO.KA', 'SNGP.KA', 'SSGC.KA', 'ATRL.KA']
 
     @staticmethod
@@ -33,4 +62,6 @@ class Config:
         """Creates data directories if they don't exist."""
         os.makedirs(Config.RAW_DATA_DIR, exist_ok=True)
         os.makedirs(Config.PROCESSED_DATA_DIR, exist_ok=True)
-        os.makedirs(Config.CLEANED_DATA_DIR, exist_ok=True)
\ No newline at end of file
+        os.makedirs(Config.CLEANED_DATA_DIR, exist_ok=True)
+        os.makedirs(Config.COLUMNAR_DATA_DIR, exist_ok=True)
+        os.makedirs(Config.QUARANTINE_DATA_DIR, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import Counter
+from config.settings import Config
+
+# CONSTANTS
+CACHE_FILE, CACHE_MAX_ENTRIES = "api_cache.sqlite", 10_000
+
+# Seconds a response stays fresh, per API method. None never expires;
+# methods not listed here are never cached.
+CACHE_TTLS = {
+    "youtube.channels.list": None,   # handle -> channel ID does not change
+    "youtube.videos.list": 60 * 60,  # view/comment counts drift quickly
+}
+# Responses without items ("not found") are retried after a day at most
+EMPTY_RESPONSE_TTL = 24 * 60 * 60
+
+class ResponseCache:
+    """SQLite-backed cache of API responses keyed by method + parameters.
+
+    Entries carry their own expiry and the table is trimmed to ``max_entries``
+    by least-recent access. Hit/miss counters and the latency of misses are
+    kept per method so ``stats()`` can show what the cache saved.
+    """
+
+    def __init__(self, path: str, max_entries: int = CACHE_MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits, self.misses = Counter(), Counter()
+        self._miss_seconds = Counter()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, endpoint TEXT, body TEXT,"
+            " expires_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict) -> str:
+        params = {k: v for k, v in params.items() if v is not None}
+        raw = endpoint + "?" + json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, endpoint: str, params: dict) -> dict | None:
+        key, now = self.make_key(endpoint, params), time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] < now):
+                self.misses[endpoint] += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits[endpoint] += 1
+        return json.loads(row[0])
+
+    def put(self, endpoint: str, params: dict, body: dict, ttl: float | None, elapsed: float = 0.0) -> None:
+        key, now = self.make_key(endpoint, params), time.time()
+        expires_at = None if ttl is None else now + ttl
+        with self._lock:
+            self._miss_seconds[endpoint] += elapsed
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, json.dumps(body), expires_at, now),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Per-method hits, misses and an estimate of the wall time hits saved."""
+        out = {}
+        for endpoint in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits[endpoint], self.misses[endpoint]
+            avg_miss = self._miss_seconds[endpoint] / misses if misses else 0.0
+            out[endpoint] = {
+                "hits": hits,
+                "misses": misses,
+                "saved_seconds": round(hits * avg_miss, 3),
+            }
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+_default_cache: ResponseCache | None = None
+_default_lock = threading.Lock()
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache at ``data/raw/api_cache.sqlite``, opened on first use."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(os.path.join(Config.RAW_DATA_DIR, CACHE_FILE))
+        return _default_cache
@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import threading
+from collections.abc import Iterator
+from pipeline import instrumentation
+
+# CONSTANTS
+STATE_SAVE_INTERVAL = 5.0
+
+_append_lock = threading.Lock()
+
+class ExtractionState:
+    """Checkpoint for incremental YouTube extraction, persisted as JSON.
+
+    Layout::
+
+        {"channels": {channel_url: channel_id},
+         "outputs": {store_name: {"searched_at": rfc3339,
+                                  "pending": {video_id: {"title", "first_seen"}},
+                                  "videos": {video_id: {"title", "completed",
+                                                        "newest_comment_at",
+                                                        "page_token", "order",
+                                                        "since"}}}}}
+
+    Channel IDs, search watermarks and pending candidates are written as
+    soon as they change. Per-page video progress is written (atomically, as
+    compact JSON) at most every ``save_interval`` seconds and by ``save()``,
+    so the file is not rewritten once per page. A run killed in between
+    re-fetches at most that many seconds of pages, and compaction drops the
+    repeats.
+    """
+
+    def __init__(self, path: str, save_interval: float = STATE_SAVE_INTERVAL):
+        self.path = path
+        self.save_interval = save_interval
+        self._lock = threading.RLock()
+        self._saved_at = time.monotonic()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.data = json.load(f)
+        else:
+            self.data = {"channels": {}, "outputs": {}}
+
+    def save(self) -> None:
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self._saved_at = time.monotonic()
+
+    def _save_if_due(self) -> None:
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def channel_id(self, url: str) -> str | None:
+        return self.data["channels"].get(url)
+
+    def set_channel_id(self, url: str, channel_id: str) -> None:
+        with self._lock:
+            self.data["channels"][url] = channel_id
+            self.save()
+
+    def output(self, name: str) -> dict:
+        with self._lock:
+            return self.data["outputs"].setdefault(name, {"searched_at": None, "videos": {}})
+
+    def set_searched_at(self, name: str, searched_at: str) -> None:
+        with self._lock:
+            self.output(name)["searched_at"] = searched_at
+            self.save()
+
+    def video(self, name: str, video_id: str, title: str = "") -> dict:
+        with self._lock:
+            return self.output(name)["videos"].setdefault(
+                video_id, {"title": title, "completed": False, "newest_comment_at": None, "page_token": None}
+            )
+
+    def update_video(self, name: str, video_id: str, **fields) -> None:
+        with self._lock:
+            self.video(name, video_id).update(fields)
+            self._save_if_due()
+
+    def pending(self, name: str) -> dict:
+        """Search hits that failed the stats filter, rechecked on later runs."""
+        with self._lock:
+            return self.output(name).setdefault("pending", {})
+
+    def set_pending(self, name: str, rejected: dict[str, str], seen_at: str, expire_before: str) -> None:
+        """Replaces ``name``'s pending candidates with ``rejected`` (video id -> title).
+
+        Each keeps the ``first_seen`` of its earlier entry; candidates first
+        seen before ``expire_before`` (both RFC 3339) are dropped for good.
+        """
+        with self._lock:
+            previous = self.pending(name)
+            pending = {}
+            for video_id, title in rejected.items():
+                first_seen = previous.get(video_id, {}).get("first_seen") or seen_at
+                if first_seen >= expire_before:
+                    pending[video_id] = {"title": title, "first_seen": first_seen}
+            self.output(name)["pending"] = pending
+            self.save()
+
+def append_video_threads(path: str, video_id: str, title: str, threads: list[dict]) -> None:
+    """Appends one JSONL record to a comment store and flushes it to disk."""
+    record = {"video_id": video_id, "video_title": title, "raw_threads": threads}
+    line = json.dumps(record) + "\n"
+    with _append_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    instrumentation.count("rows_written", len(threads))
+    instrumentation.count("bytes_written", len(line.encode("utf-8")))
+
+def compact_comments_jsonl(path: str) -> None:
+    """Merges every record of a video into one line, dropping repeated threads.
+
+    Only byte offsets are indexed up front; each video's records are then
+    read and merged on their own, so memory stays at one video.
+    """
+    offsets = {}
+    with open(path, "rb") as f:
+        while True:
+            pos = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            if line.strip():
+                offsets.setdefault(json.loads(line)["video_id"], []).append(pos)
+
+    tmp_path = path + ".tmp"
+    with open(path, "rb") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+        for video_id, positions in offsets.items():
+            title, threads, seen = "", [], set()
+            for pos in positions:
+                src.seek(pos)
+                record = json.loads(src.readline())
+                title = record.get("video_title") or title
+                for thread in record.get("raw_threads", []):
+                    if thread["id"] not in seen:
+                        seen.add(thread["id"])
+                        threads.append(thread)
+
+            merged = {"video_id": video_id, "video_title": title, "raw_threads": threads}
+            dst.write(json.dumps(merged) + "\n")
+    os.replace(tmp_path, path)
+
+def seed_state_from_store(
+    state: ExtractionState, name: str, jsonl_path: str, legacy_path: str | None = None
+) -> None:
+    """Marks videos already in an existing store as complete for a fresh state.
+
+    A legacy ``.json`` dump is converted to ``jsonl_path`` first, so the
+    incremental run merges into the data we already have instead of
+    re-downloading it.
+    """
+    output = state.output(name)
+    if output["videos"] or output["searched_at"]:
+        return
+
+    if not os.path.exists(jsonl_path) and legacy_path and os.path.exists(legacy_path):
+        print(f"Converting {legacy_path} to {jsonl_path}...")
+        for video_id, video_info in iter_raw_comments(legacy_path):
+            append_video_threads(
+                jsonl_path, video_id, video_info.get("video_title", ""), video_info.get("raw_threads", [])
+            )
+
+    if not os.path.exists(jsonl_path):
+        return
+
+    for video_id, video_info in iter_raw_comments(jsonl_path):
+        entry = state.video(name, video_id, video_info.get("video_title", ""))
+        newest = max(
+            [entry.get("newest_comment_at") or ""]
+            + [t["snippet"]["topLevelComment"]["snippet"].get("publishedAt", "") for t in video_info["raw_threads"]]
+        )
+        entry.update(completed=True, newest_comment_at=newest or None)
+    state.save()
+    print(f"Seeded {len(output['videos'])} videos for {name} from {jsonl_path}.")
+
+def iter_raw_comments(path: str) -> Iterator[tuple[str, dict]]:
+    """Yields ``(video_id, {"video_title", "raw_threads"})`` from a comments file.
+
+    ``.jsonl`` files are read one line at a time; the legacy ``.json`` dump
+    has to be loaded whole.
+    """
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield record["video_id"], {
+                    "video_title": record.get("video_title", ""),
+                    "raw_threads": record.get("raw_threads", []),
+                }
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        yield from json.load(f).items()
+
+def iter_flattened_comments(path: str) -> Iterator[dict]:
+    """Yields one flat row per top-level comment and reply, as the notebook's ``parsed_comments``."""
+    for _, video_info in iter_raw_comments(path):
+        title = video_info.get("video_title", "")
+        for item in video_info.get("raw_threads", []):
+            top_comment = item["snippet"]["topLevelComment"]["snippet"]
+            yield {
+                "Video_Title": title,
+                "Comment_ID": item["snippet"]["topLevelComment"]["id"],
+                "Published_At": top_comment.get("publishedAt"),
+                "Like_Count": top_comment.get("likeCount", 0),
+                "Comment": top_comment.get("textDisplay")
+            }
+            for reply in item.get("fetched_replies", []):
+                r_snippet = reply["snippet"]
+                yield {
+                    "Video_Title": title,
+                    "Comment_ID": reply["id"],
+                    "Published_At": r_snippet.get("publishedAt"),
+                    "Like_Count": r_snippet.get("likeCount", 0),
+                    "Comment": r_snippet.get("textDisplay")
+                }
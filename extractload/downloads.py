@@ -0,0 +1,156 @@
+import os
+import json
+import hashlib
+from email.utils import formatdate
+from pipeline import instrumentation
+from pipeline.dag import check_cancelled
+
+# CONSTANTS
+CHUNK_SIZE, DOWNLOAD_TIMEOUT = 1 << 20, 30
+
+def _meta_path(path: str) -> str:
+    return path + ".meta.json"
+
+def _read_meta(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _write_meta(path: str, meta: dict) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _discard_part(part_path: str) -> None:
+    for stale in (part_path, _meta_path(part_path)):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+def _resumed_at(response) -> int | None:
+    """First byte of a 206 response, from ``Content-Range: bytes <first>-<last>/<length>``."""
+    unit, _, spec = (response.headers.get("Content-Range") or "").partition(" ")
+    first = spec.split("-", 1)[0]
+    return int(first) if unit == "bytes" and first.isdigit() else None
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def download_file(
+    url: str,
+    path: str,
+    headers: dict | None = None,
+    sha256: str | None = None,
+    session=None,
+    chunk_size: int = CHUNK_SIZE,
+    timeout: float = DOWNLOAD_TIMEOUT,
+) -> str:
+    """Streams ``url`` to ``path``, transferring nothing the local copy already has.
+
+    Returns "downloaded", "not_modified" or "unchanged" (re-sent by the server
+    but byte-identical to the stored checksum). Raises on HTTP or I/O errors,
+    leaving any previous ``path`` untouched.
+
+    - Validators (ETag, Last-Modified, size, sha256) are kept next to the file
+      in ``path + ".meta.json"`` and sent back as If-None-Match /
+      If-Modified-Since. A file without metadata is revalidated against its
+      mtime, and ``sha256`` skips the request entirely if the file matches.
+    - Bytes stream into ``path + ".part"`` in ``chunk_size`` pieces. An
+      interrupted transfer resumes with ``Range``, guarded by ``If-Range`` so
+      a changed remote file restarts from zero instead of being spliced. A
+      ``.part`` the server will not resume (416, e.g. it is already complete)
+      or a 206 that does not start where the ``.part`` ends is discarded and
+      the file is fetched again from zero.
+    - The finished file is renamed into place atomically.
+    """
+    import requests
+
+    part_path, meta = path + ".part", _read_meta(_meta_path(path))
+    if sha256 and os.path.exists(path):
+        stored = meta.get("sha256") if meta.get("size") == os.path.getsize(path) else None
+        if (stored or file_sha256(path)) == sha256:
+            return "not_modified"
+
+    req_headers = dict(headers or {})
+    if os.path.exists(path):
+        if meta.get("etag"):
+            req_headers["If-None-Match"] = meta["etag"]
+        req_headers["If-Modified-Since"] = meta.get("last_modified") or formatdate(
+            os.path.getmtime(path), usegmt=True
+        )
+
+    part_meta = _read_meta(_meta_path(part_path))
+    resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if resume_from and part_meta.get("url") == url and (part_meta.get("etag") or part_meta.get("last_modified")):
+        req_headers["Range"] = f"bytes={resume_from}-"
+        req_headers["If-Range"] = part_meta.get("etag") or part_meta["last_modified"]
+    else:
+        resume_from = 0
+
+    http = session or requests
+    with http.get(url, headers=req_headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 304:
+            return "not_modified"
+        if resume_from and (
+            response.status_code == 416 or response.status_code == 206 and _resumed_at(response) != resume_from
+        ):
+            print(f"Cannot resume {url} at byte {resume_from:,} (HTTP {response.status_code}); downloading it again.")
+            response.close()
+            _discard_part(part_path)
+            return download_file(url, path, headers, sha256, session, chunk_size, timeout)
+        response.raise_for_status()
+
+        validators = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        digest = hashlib.sha256()
+        if response.status_code == 206:
+            with open(part_path, "rb") as f:
+                while chunk := f.read(chunk_size):
+                    digest.update(chunk)
+            mode = "ab"
+        else:
+            resume_from, mode = 0, "wb"
+        _write_meta(_meta_path(part_path), validators)
+
+        # Content-Length counts encoded bytes, so only check it for identity transfers
+        expected_size = response.headers.get("Content-Length")
+        if expected_size is None or response.headers.get("Content-Encoding"):
+            expected_size = None
+        else:
+            expected_size = resume_from + int(expected_size)
+        with open(part_path, mode) as f, instrumentation.timer("download"):
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                check_cancelled()
+                f.write(chunk)
+                digest.update(chunk)
+                instrumentation.count("bytes_downloaded", len(chunk))
+            f.flush()
+            os.fsync(f.fileno())
+
+    size = os.path.getsize(part_path)
+    if expected_size is not None and size != expected_size:
+        # Keep the partial file; the next call resumes from here
+        raise IOError(f"Incomplete download of {url}: {size} of {expected_size} bytes")
+    checksum = digest.hexdigest()
+    if sha256 and checksum != sha256:
+        os.remove(part_path)
+        raise ValueError(f"Checksum mismatch for {url}: expected {sha256}, got {checksum}")
+
+    unchanged = os.path.exists(path) and meta.get("sha256") == checksum
+    os.replace(part_path, path)
+    os.remove(_meta_path(part_path))
+    _write_meta(_meta_path(path), {**validators, "size": size, "sha256": checksum})
+    if resume_from:
+        print(f"Resumed {url} at byte {resume_from:,}.")
+    instrumentation.record_output(path)
+    instrumentation.log_event("download", url=url, bytes=size, resumed_from=resume_from, unchanged=unchanged)
+    return "unchanged" if unchanged else "downloaded"
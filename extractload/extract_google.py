@@ -3,13 +3,31 @@ import csv
 import re
 import time
 import json
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
 from urllib.parse import urlparse
-import googleapiclient.discovery
 from config.settings import Config
+from pipeline import instrumentation
+from pipeline.dag import cancel_on_timeout
+from extractload.api_cache import CACHE_TTLS, EMPTY_RESPONSE_TTL, get_response_cache
+from extractload.quota import QUOTA_COSTS, RateLimiter, get_scheduler
+from extractload.comment_store import (
+    ExtractionState,
+    append_video_threads,
+    compact_comments_jsonl,
+    seed_state_from_store,
+)
 
 # CONSTANTS
 MIN_VIEWS, MIN_COMMENTS, VIDS_PER_CHANNEL, API_RETRY_DELAY = 100, 1, 1000, 2
+MAX_WORKERS, REQUESTS_PER_SECOND = 8, 10.0
+SEARCH_SLICE_DAYS, SEARCH_WORKERS, SEARCH_EMPTY_PAGES, SEARCH_MAX_PAGES = 30, 4, 1, 10
+SEARCH_PAGE_BUDGET = 40  # search pages cost 100 units each; keep most of the daily quota for comments
+PENDING_RECHECK_DAYS = 30
+STATE_FILE = "extract_state.json"
 
 COMMENT_CSV_HEADERS = [
     "Video ID", "Video Title", "Comment ID", "Parent ID",
@@ -17,21 +35,61 @@ COMMENT_CSV_HEADERS = [
 ]
 
 # UTILS
-def build_youtube_client(): return googleapiclient.discovery.build("youtube", "v3", developerKey=Config.YOUTUBE_API_KEY)
-
-def _api_call_with_retry(fn, *args, retry_delay: int = API_RETRY_DELAY, **kwargs):
-    delay = retry_delay
-    while True:
-        try:
-            return fn(*args, **kwargs).execute()
-        except Exception as e:
-            print(f"API error: {e}. Retrying in {delay}s...")
-            time.sleep(delay)
-            delay *= 2
+def build_youtube_client():
+    import googleapiclient.discovery  # slow import; only paid by runs that call the API
+    return googleapiclient.discovery.build("youtube", "v3", developerKey=Config.YOUTUBE_API_KEY)
+
+_thread_local = threading.local()
+
+def _thread_client(client_factory=None):
+    """Returns a per-thread YouTube client; googleapiclient resources are not thread-safe."""
+    factory = client_factory or build_youtube_client
+    cached = getattr(_thread_local, "client", None)
+    if cached is None or cached[0] is not factory:
+        cached = (factory, factory())
+        _thread_local.client = cached
+    return cached[1]
+
+_ENDPOINT_TTL = object()
+
+def _api_call_with_retry(
+    fn,
+    *args,
+    retry_delay: int = API_RETRY_DELAY,
+    limiter: RateLimiter | None = None,
+    cache_ttl=_ENDPOINT_TTL,
+    **kwargs,
+):
+    """Executes ``fn(*args, **kwargs)`` through the response cache and quota scheduler.
+
+    ``cache_ttl`` overrides the per-method TTL from CACHE_TTLS (None caches
+    forever); methods without a TTL go straight to the API. Responses with an
+    empty ``items`` list are kept for EMPTY_RESPONSE_TTL at most, so a lookup
+    that found nothing is retried. Returns None when the call fails or the
+    scheduler refuses it.
+    """
+    try:
+        request = fn(*args, **kwargs)
+    except Exception as e:
+        print(f"API error: {e}. Could not build request.")
+        return None
 
-            if delay > 10:
-                print("Failed to process request. Breaking.")
-                break
+    endpoint = getattr(request, "methodId", None) or fn.__qualname__
+    ttl = CACHE_TTLS.get(endpoint, _ENDPOINT_TTL) if cache_ttl is _ENDPOINT_TTL else cache_ttl
+    cache = get_response_cache() if ttl is not _ENDPOINT_TTL else None
+    if cache is not None:
+        cached = cache.get(endpoint, kwargs)
+        if cached is not None:
+            instrumentation.count("api_cache_hits")
+            return cached
+
+    started = time.monotonic()
+    resp = get_scheduler().execute(endpoint, request.execute, limiter, base_delay=retry_delay)
+    if cache is not None and resp is not None:
+        if "items" in resp and not resp["items"]:
+            ttl = EMPTY_RESPONSE_TTL if ttl is None else min(ttl, EMPTY_RESPONSE_TTL)
+        cache.put(endpoint, kwargs, resp, ttl, time.monotonic() - started)
+    return resp
 
 def compile_title_pattern(keyword: str) -> re.Pattern: return re.compile(r"\b" + re.escape(keyword) + r"\b", re.IGNORECASE)
 
@@ -56,7 +114,7 @@ def resolve_channel_id(yt, url: str):
 
     # Fallback: search by handle name
     resp = _api_call_with_retry(
-        yt.search().list, part="snippet", q=handle, type="channel", maxResults=1
+        yt.search().list, part="snippet", q=handle, type="channel", maxResults=1, cache_ttl=None
     )
     if resp and resp.get("items"):
         return resp["items"][0]["snippet"]["channelId"]
@@ -65,7 +123,11 @@ def resolve_channel_id(yt, url: str):
     return None
 
 def search_videos_in_channel(
-    yt, channel_id: str, keyword: str, max_results: int = VIDS_PER_CHANNEL
+    yt,
+    channel_id: str,
+    keyword: str,
+    max_results: int = VIDS_PER_CHANNEL,
+    published_after: str | None = None,
 ):
     resp = _api_call_with_retry(
         yt.search().list,
@@ -75,61 +137,20 @@ def search_videos_in_channel(
         q=keyword,
         order="date",
         maxResults=max_results,
+        publishedAfter=published_after,
     )
     if not resp:
         return []
 
     pattern = compile_title_pattern(keyword)
-    return [
+    matched = [
         (item["id"]["videoId"], item["snippet"]["title"])
         for item in resp.get("items", [])
         if item["id"].get("videoId") and pattern.search(item["snippet"].get("title", ""))
     ]
-
-def search_videos_globally(
-    yt,
-    query: str,
-    title_patterns: list[re.Pattern],
-    published_after: str,
-    published_before: str,
-    max_videos: int | None = None,
-):
-    matched, page_token, total_checked = [], None, 0
-
-    while True:
-        if max_videos is not None and len(matched) >= max_videos:
-            print(f"Reached max_videos={max_videos}, stopping search.")
-            break
-
-        resp = _api_call_with_retry(
-            yt.search().list,
-            part="snippet",
-            q=query,
-            type="video",
-            maxResults=50,
-            pageToken=page_token,
-            publishedAfter=published_after,
-            publishedBefore=published_before,
-            order="relevance",
-        )
-        if not resp:
-            break
-
-        for item in resp.get("items", []):
-            total_checked += 1
-            vid = item["id"].get("videoId")
-            title = item["snippet"].get("title", "")
-            if vid and all(p.search(title) for p in title_patterns):
-                matched.append((vid, title))
-                print(f"[matched] {vid} - {title}")
-                if max_videos is not None and len(matched) >= max_videos:
-                    break
-
-        page_token = resp.get("nextPageToken")
-        if not page_token:
-            break
-
-    print(f"Global search complete. Checked ~{total_checked} results, found {len(matched)} videos.")
+    instrumentation.log_event(
+        "channel_search", channel_id=channel_id, keyword=keyword, checked=len(resp.get("items", [])), matched=len(matched)
+    )
     return matched
 
 def filter_videos_by_stats(
@@ -160,6 +181,7 @@ def filter_videos_by_stats(
             else:
                 print(f"[filtered-out] {vid_id} (views={view_count}, comments={comment_count})")
 
+    instrumentation.log_event("filter_videos", candidates=len(ids), kept=len(kept))
     return kept
 
 def _build_rfc3339_window(
@@ -174,34 +196,233 @@ def _build_rfc3339_window(
     end_date_rfc3339 = end_dt.isoformat(timespec="seconds").replace("+00:00", "Z")
     return start_date_rfc3339, end_date_rfc3339
 
-def _collect_videos_from_channels(yt, keywords: list[str]) -> list[tuple[str, str]]:
-    channel_ids = [resolve_channel_id(yt, url) for url in Config.CHANNELS]
-    channel_ids = [cid for cid in channel_ids if cid]
+def _parse_rfc3339(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
 
-    seen, collected = set(), []
+def _format_rfc3339(value: datetime) -> str:
+    return value.isoformat(timespec="seconds").replace("+00:00", "Z")
+
+def plan_search_slices(
+    published_after: str, published_before: str, slice_days: float = SEARCH_SLICE_DAYS
+) -> list[tuple[str, str]]:
+    """Splits an RFC 3339 window into ``(after, before)`` slices of ``slice_days``, newest first."""
+    start, end = _parse_rfc3339(published_after), _parse_rfc3339(published_before)
+    step, slices = timedelta(days=slice_days), []
+    while end > start:
+        slice_start = max(start, end - step)
+        slices.append((_format_rfc3339(slice_start), _format_rfc3339(end)))
+        end = slice_start
+    return slices
+
+def _search_slice(
+    yt,
+    query: str,
+    title_patterns: list[re.Pattern],
+    published_after: str,
+    published_before: str,
+    empty_pages: int = SEARCH_EMPTY_PAGES,
+    max_pages: int = SEARCH_MAX_PAGES,
+    take_page=None,
+) -> tuple[list[tuple[str, str]], int, bool]:
+    """Pages one slice until it runs out, or ``empty_pages`` pages in a row match no title.
+
+    Returns ``(matched, pages, truncated)``; ``truncated`` means the slice
+    was still matching when it hit the per-query result cap (``max_pages``).
+    ``take_page()`` is asked before every request and stops the slice once
+    it returns False.
+    """
+    matched, page_token, pages, misses = [], None, 0, 0
+    while pages < max_pages:
+        if take_page is not None and not take_page():
+            return matched, pages, False
+        resp = _api_call_with_retry(
+            yt.search().list,
+            part="snippet",
+            q=query,
+            type="video",
+            maxResults=50,
+            pageToken=page_token,
+            publishedAfter=published_after,
+            publishedBefore=published_before,
+            order="relevance",
+        )
+        if not resp:
+            return matched, pages, False
+        pages += 1
+        instrumentation.count("search_pages")
+
+        hits = [
+            (item["id"]["videoId"], item["snippet"].get("title", ""))
+            for item in resp.get("items", [])
+            if item["id"].get("videoId") and all(p.search(item["snippet"].get("title", "")) for p in title_patterns)
+        ]
+        matched.extend(hits)
+        misses = 0 if hits else misses + 1
+        page_token = resp.get("nextPageToken")
+        if not page_token or misses >= empty_pages:
+            return matched, pages, False
+    return matched, pages, True
+
+def search_videos_sliced(
+    yt,
+    query: str,
+    title_patterns: list[re.Pattern],
+    published_after: str,
+    published_before: str,
+    slice_days: float = SEARCH_SLICE_DAYS,
+    max_workers: int = SEARCH_WORKERS,
+    empty_pages: int = SEARCH_EMPTY_PAGES,
+    page_budget: int | None = SEARCH_PAGE_BUDGET,
+    max_videos: int | None = None,
+    exclude: set[str] | None = None,
+    client_factory=None,
+) -> list[tuple[str, str]]:
+    """Global search planned as concurrent time slices instead of one relevance crawl.
+
+    The window is cut by plan_search_slices and each slice is paged on its
+    own, stopping once its pages stop producing title matches. A slice that
+    hits the API's per-query cap while still matching is split in half and
+    searched again, so long windows are not silently truncated. All slices
+    share ``page_budget`` search pages. Matches are merged newest slice
+    first, without repeats or ids in ``exclude``.
+    Worker threads use their own client from ``client_factory``. Without a
+    factory, or with ``max_workers <= 1``, slices run one at a time on ``yt``
+    (a client must not be shared between threads).
+    """
+    if client_factory is None:
+        max_workers = 1
+    budget_lock, budget = threading.Lock(), [page_budget]
+
+    def take_page():
+        with budget_lock:
+            if budget[0] is None:
+                return True
+            budget[0] -= 1
+            return budget[0] >= 0
+
+    def run_slice(after, before):
+        client = yt if max_workers <= 1 else _thread_client(client_factory)
+        return _search_slice(client, query, title_patterns, after, before, empty_pages, take_page=take_page)
+
+    slices = plan_search_slices(published_after, published_before, slice_days)
+    results, pages, splits = {}, 0, 0
+    with cancel_on_timeout(ThreadPoolExecutor(max(1, max_workers), thread_name_prefix="yt-search")) as pool:
+        running = {pool.submit(instrumentation.bind(run_slice), *s): s for s in slices}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                after, before = running.pop(future)
+                matched, slice_pages, truncated = future.result()
+                pages += slice_pages
+                results[(after, before)] = matched
+                span = _parse_rfc3339(before) - _parse_rfc3339(after)
+                if truncated and span > timedelta(days=1) and (budget[0] is None or budget[0] > 0):
+                    splits += 1
+                    middle = _format_rfc3339(_parse_rfc3339(after) + span / 2)
+                    for half in ((middle, before), (after, middle)):
+                        running[pool.submit(instrumentation.bind(run_slice), *half)] = half
+
+    seen, videos = set(exclude or ()), []
+    for key in sorted(results, reverse=True):
+        for vid, title in results[key]:
+            if vid not in seen:
+                seen.add(vid)
+                videos.append((vid, title))
+    if max_videos is not None:
+        videos = videos[:max_videos]
+
+    units = pages * QUOTA_COSTS["youtube.search.list"]
+    ratio = len(videos) / units if units else 0.0
+    print(
+        f"Sliced search complete: {len(slices)} slices ({splits} split), {pages} pages, {units} units, "
+        f"{len(videos)} new videos ({ratio:.3f} matched per quota unit)."
+    )
+    instrumentation.log_event(
+        "sliced_search", query=query, slices=len(slices), splits=splits, pages=pages,
+        units=units, matched=len(videos), matched_per_unit=round(ratio, 4),
+    )
+    return videos
+
+def _resolve_channel_ids(yt, state: ExtractionState | None = None) -> list[str]:
+    channel_ids = []
+    for url in Config.CHANNELS:
+        cid = state.channel_id(url) if state is not None else None
+        if cid is None:
+            cid = resolve_channel_id(yt, url)
+            if cid and state is not None:
+                state.set_channel_id(url, cid)
+        if cid:
+            channel_ids.append(cid)
+    return channel_ids
+
+def _filter_candidates(
+    yt,
+    candidates: list[tuple[str, str]],
+    state: ExtractionState | None = None,
+    state_key: str | None = None,
+    min_views: int = MIN_VIEWS,
+    min_comments: int = MIN_COMMENTS,
+    exclude: set[str] | None = None,
+) -> list[tuple[str, str]]:
+    """filter_videos_by_stats, rechecking earlier rejects when ``state`` is kept.
+
+    Incremental searches only return videos published since the last run, so
+    a new upload still below the thresholds would never be seen again.
+    Rejected candidates are kept as ``state_key``'s pending videos and
+    checked again on every run for PENDING_RECHECK_DAYS after they were
+    first found (ids in ``exclude`` are left out of the recheck).
+    """
+    if state is None:
+        return filter_videos_by_stats(yt, candidates, min_views, min_comments)
+
+    skip = {vid for vid, _ in candidates} | set(exclude or ())
+    recheck = [(vid, entry.get("title", "")) for vid, entry in state.pending(state_key).items() if vid not in skip]
+    if recheck:
+        print(f"Rechecking {len(recheck)} pending videos for {state_key}.")
+    candidates = list(candidates) + recheck
+    kept = filter_videos_by_stats(yt, candidates, min_views, min_comments) if candidates else []
+
+    kept_ids = {vid for vid, _ in kept}
+    now = datetime.now(timezone.utc)
+    state.set_pending(
+        state_key,
+        {vid: title for vid, title in candidates if vid not in kept_ids},
+        seen_at=_format_rfc3339(now),
+        expire_before=_format_rfc3339(now - timedelta(days=PENDING_RECHECK_DAYS)),
+    )
+    return kept
+
+def _collect_videos_from_channels(
+    yt,
+    keywords: list[str],
+    state: ExtractionState | None = None,
+    published_after: str | None = None,
+    state_key: str | None = None,
+) -> list[tuple[str, str]]:
+    """Keyword searches over Config.CHANNELS, then one stats filter over every new hit.
+
+    With ``state``, rejected hits are rechecked on later runs (see _filter_candidates).
+    """
+    channel_ids = _resolve_channel_ids(yt, state)
+
+    seen, candidates = set(), []
 
     for keyword in keywords:
         print(f"Searching channel videos for keyword: '{keyword}'")
-        candidates = []
+        found = 0
 
         for cid in channel_ids:
-            candidates.extend(search_videos_in_channel(yt, cid, keyword))
+            for vid, title in search_videos_in_channel(yt, cid, keyword, published_after=published_after):
+                if vid not in seen:
+                    seen.add(vid)
+                    candidates.append((vid, title))
+                    found += 1
 
-        new_candidates = [(vid, title) for vid, title in candidates if vid not in seen]
-        if not new_candidates:
+        if not found:
             print(f"No new videos found for keyword '{keyword}'.")
-            continue
-
-        filtered = filter_videos_by_stats(yt, new_candidates)
-        print(
-            f"{len(filtered)}/{len(new_candidates)} videos passed thresholds "
-            f"for keyword '{keyword}'."
-        )
-
-        for vid_id, title in filtered:
-            seen.add(vid_id)
-            collected.append((vid_id, title))
 
+    collected = _filter_candidates(yt, candidates, state, state_key)
+    print(f"{len(collected)} channel videos passed thresholds.")
     return collected
 
 def _collect_videos_globally(
@@ -212,31 +433,86 @@ def _collect_videos_globally(
     min_views: int = MIN_VIEWS,
     min_comments: int = MIN_COMMENTS,
     max_videos: int | None = None,
+    published_after: str | None = None,
+    exclude: set[str] | None = None,
+    client_factory=None,
+    state: ExtractionState | None = None,
+    state_key: str | None = None,
 ) -> list[tuple[str, str]]:
-    published_after, published_before = _build_rfc3339_window(timeframe_days)
+    """Sliced global search, skipping ``exclude`` (e.g. videos already taken from channels), then stats filter.
+
+    Slices are searched concurrently only when ``client_factory`` is given;
+    otherwise they run serially on ``yt``. With ``state``, rejected hits are
+    rechecked on later runs (see _filter_candidates).
+    """
+    window_start, published_before = _build_rfc3339_window(timeframe_days)
+    published_after = max(published_after or window_start, window_start)
     print(
         f"Searching globally for '{query}' between "
         f"{published_after} and {published_before}..."
     )
 
     title_patterns = [compile_title_pattern(kw) for kw in title_keywords]
-    matched = search_videos_globally(yt, query, title_patterns, published_after, published_before, max_videos)
+    matched = search_videos_sliced(
+        yt, query, title_patterns, published_after, published_before,
+        max_videos=max_videos, exclude=exclude, client_factory=client_factory,
+    )
 
     if not matched:
         print("No matching videos found.")
-        return []
+        if state is None:
+            return []
 
-    filtered = filter_videos_by_stats(yt, matched, min_views, min_comments)
+    filtered = _filter_candidates(yt, matched, state, state_key, min_views, min_comments, exclude)
     print(
         f"{len(filtered)} videos remain after filtering "
         f"(min_views={min_views}, min_comments={min_comments})."
     )
     return filtered
 
-def fetch_all_comments_raw(yt, video_id: str) -> list[dict]:
-    """Fetches native JSON dicts from YouTube API."""
-    raw_threads = []
-    page_token = None
+def _fetch_replies_raw(yt, top_id: str, limiter: RateLimiter | None = None) -> list[dict]:
+    all_replies = []
+    r_page_token = None
+    while True:
+        r_resp = _api_call_with_retry(
+            yt.comments().list,
+            part="snippet",
+            parentId=top_id,
+            maxResults=100,
+            pageToken=r_page_token,
+            textFormat="plainText",
+            limiter=limiter,
+        )
+        if not r_resp:
+            break
+        instrumentation.count("reply_pages")
+        all_replies.extend(r_resp.get("items", []))
+        r_page_token = r_resp.get("nextPageToken")
+        if not r_page_token:
+            break
+    return all_replies
+
+def _thread_published_at(item: dict) -> str:
+    return item["snippet"]["topLevelComment"]["snippet"].get("publishedAt", "")
+
+def _fetch_comment_pages(
+    yt,
+    video_id: str,
+    attach_replies,
+    limiter: RateLimiter | None = None,
+    order: str = "relevance",
+    page_token: str | None = None,
+    since: str | None = None,
+    on_page=None,
+) -> list[dict]:
+    """Pages through a video's comment threads.
+
+    ``page_token`` resumes an interrupted listing. With ``since`` (an RFC 3339
+    timestamp, meant for ``order="time"``) paging stops at the first thread
+    published at or before it. ``on_page(items, next_page_token)`` is called
+    after every page; ``next_page_token`` is None once the listing is done.
+    """
+    raw_threads, pages = [], 0
 
     while True:
         resp = _api_call_with_retry(
@@ -246,52 +522,192 @@ def fetch_all_comments_raw(yt, video_id: str) -> list[dict]:
             maxResults=100,
             pageToken=page_token,
             textFormat="plainText",
-            order="relevance",
+            order=order,
+            limiter=limiter,
         )
         if not resp:
             break
-
-        # Iterate through threads to paginate replies if they exist
-        for item in resp.get("items", []):
-            top_id = item["snippet"]["topLevelComment"]["id"]
-            
-            # Pull paginated replies as a raw nested list inside the dict
-            if item["snippet"].get("totalReplyCount", 0) > 0:
-                all_replies = []
-                r_page_token = None
-                while True:
-                    r_resp = _api_call_with_retry(
-                        yt.comments().list,
-                        part="snippet",
-                        parentId=top_id,
-                        maxResults=100,
-                        pageToken=r_page_token,
-                        textFormat="plainText",
-                    )
-                    if not r_resp:
-                        break
-                    all_replies.extend(r_resp.get("items", []))
-                    r_page_token = r_resp.get("nextPageToken")
-                    if not r_page_token:
-                        break
-                item["fetched_replies"] = all_replies
-
-            raw_threads.append(item)
-
-        page_token = resp.get("nextPageToken")
+        pages += 1
+        instrumentation.count("comment_pages")
+
+        items = resp.get("items", [])
+        reached_since = False
+        if since is not None:
+            fresh = [item for item in items if _thread_published_at(item) > since]
+            reached_since = len(fresh) < len(items)
+            items = fresh
+
+        attach_replies(items)
+        raw_threads.extend(items)
+
+        page_token = None if reached_since else resp.get("nextPageToken")
+        if on_page is not None:
+            on_page(items, page_token)
         if not page_token:
             break
 
+    replies = sum(len(item.get("fetched_replies", [])) for item in raw_threads)
+    instrumentation.count("comments_fetched", len(raw_threads) + replies)
+    instrumentation.log_event("video_comments", video_id=video_id, pages=pages, threads=len(raw_threads), replies=replies)
     return raw_threads
 
-def write_comments_to_json(output_path: str, videos: list[tuple[str, str]], yt) -> None:
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+def _serial_reply_attacher(yt, limiter: RateLimiter | None = None):
+    def attach_replies(items):
+        # Pull paginated replies as a raw nested list inside the dict
+        for item in items:
+            if item["snippet"].get("totalReplyCount", 0) > 0:
+                top_id = item["snippet"]["topLevelComment"]["id"]
+                item["fetched_replies"] = _fetch_replies_raw(yt, top_id, limiter)
 
-    all_raw_data = {}
+    return attach_replies
+
+def _concurrent_reply_attacher(reply_pool: ThreadPoolExecutor, limiter: RateLimiter | None = None, client_factory=None):
+    def fetch_replies(top_id):
+        return _fetch_replies_raw(_thread_client(client_factory), top_id, limiter)
+
+    def attach_replies(items):
+        pending = [
+            (item, reply_pool.submit(instrumentation.bind(fetch_replies), item["snippet"]["topLevelComment"]["id"]))
+            for item in items
+            if item["snippet"].get("totalReplyCount", 0) > 0
+        ]
+        for item, future in pending:
+            item["fetched_replies"] = future.result()
+
+    return attach_replies
+
+def fetch_all_comments_raw(yt, video_id: str, limiter: RateLimiter | None = None) -> list[dict]:
+    """Fetches native JSON dicts from YouTube API."""
+    return _fetch_comment_pages(yt, video_id, _serial_reply_attacher(yt, limiter), limiter)
+
+def fetch_all_comments_raw_concurrent(
+    video_id: str,
+    reply_pool: ThreadPoolExecutor,
+    limiter: RateLimiter | None = None,
+    client_factory=None,
+) -> list[dict]:
+    """Same payload as fetch_all_comments_raw, with each page's reply threads fetched in parallel."""
+    attach_replies = _concurrent_reply_attacher(reply_pool, limiter, client_factory)
+    return _fetch_comment_pages(_thread_client(client_factory), video_id, attach_replies, limiter)
+
+def fetch_comments_checkpointed(
+    yt,
+    video_id: str,
+    title: str,
+    output_path: str,
+    state: ExtractionState,
+    state_key: str,
+    attach_replies,
+    limiter: RateLimiter | None = None,
+) -> bool:
+    """Fetches one video's comments page by page, recording a checkpoint after every page.
+
+    Each page is appended to the JSONL store at ``output_path`` and the next
+    page token and newest comment timestamp are recorded in ``state``. An
+    interrupted video resumes from its saved page token. A completed video is
+    re-listed newest-first and only threads newer than its high-water mark
+    are fetched. Returns True once the video is fully up to date.
+    """
+    entry = state.video(state_key, video_id, title)
+    if entry.get("page_token"):
+        order, page_token, since = entry.get("order", "relevance"), entry["page_token"], entry.get("since")
+    elif entry.get("completed"):
+        order, page_token, since = "time", None, entry.get("newest_comment_at")
+    else:
+        order, page_token, since = "relevance", None, None
+    state.update_video(state_key, video_id, order=order, since=since)
+
+    done = False
+
+    def on_page(items, next_page_token):
+        nonlocal done
+        if items:
+            append_video_threads(output_path, video_id, title, items)
+        newest = max(
+            [entry.get("newest_comment_at") or ""] + [_thread_published_at(item) for item in items]
+        )
+        state.update_video(state_key, video_id, page_token=next_page_token, newest_comment_at=newest or None)
+        done = next_page_token is None
+
+    _fetch_comment_pages(
+        yt, video_id, attach_replies, limiter,
+        order=order, page_token=page_token, since=since, on_page=on_page,
+    )
+
+    if done:
+        state.update_video(state_key, video_id, completed=True, order=None, since=None)
+    else:
+        print(f"Stopped early on {video_id}; will resume from the saved page token.")
+    return done
+
+def _iter_video_comments(
+    videos: list[tuple[str, str]], yt, requests_per_second: float = REQUESTS_PER_SECOND
+) -> Iterator[tuple[str, str, list[dict]]]:
+    limiter = RateLimiter(requests_per_second)
     for video_id, title in videos:
         print(f"Fetching raw comments for video {video_id} | {title} ...")
-        raw_data = fetch_all_comments_raw(yt, video_id)
+        yield video_id, title, fetch_all_comments_raw(yt, video_id, limiter)
+
+def _iter_video_comments_concurrent(
+    videos: list[tuple[str, str]],
+    max_workers: int,
+    requests_per_second: float,
+    client_factory=None,
+) -> Iterator[tuple[str, str, list[dict]]]:
+    """Harvests videos on a pool but yields them in input order.
+
+    At most ``2 * max_workers`` videos are in flight, so finished-but-unyielded
+    results stay bounded no matter how long the video list is.
+    """
+    limiter = RateLimiter(requests_per_second)
+
+    def harvest(video_id, title):
+        print(f"Fetching raw comments for video {video_id} | {title} ...")
+        return fetch_all_comments_raw_concurrent(video_id, reply_pool, limiter, client_factory)
+
+    with cancel_on_timeout(ThreadPoolExecutor(max_workers, thread_name_prefix="yt-replies")) as reply_pool, \
+         cancel_on_timeout(ThreadPoolExecutor(max_workers, thread_name_prefix="yt-videos")) as video_pool:
+        pending = deque()
+        for video_id, title in videos:
+            pending.append((video_id, title, video_pool.submit(instrumentation.bind(harvest), video_id, title)))
+            if len(pending) >= 2 * max_workers:
+                video_id, title, future = pending.popleft()
+                yield video_id, title, future.result()
+
+        while pending:
+            video_id, title, future = pending.popleft()
+            yield video_id, title, future.result()
+
+def _write_video_comments(
+    output_path: str, video_comments: Iterable[tuple[str, str, list[dict]]], streaming: bool = False
+) -> None:
+    """Writes harvested videos either as one JSON document or as JSONL.
+
+    The JSONL layout has one ``{"video_id", "video_title", "raw_threads"}``
+    object per line, flushed as soon as the video is done, so memory stays at
+    one video and a crash keeps every line written so far.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
+    if streaming:
+        threads = 0
+        with open(output_path, "w", encoding="utf-8") as f:
+            for video_id, title, raw_data in video_comments:
+                if not raw_data:
+                    print(f"No comments fetched for {video_id}.")
+                    continue
+
+                record = {"video_id": video_id, "video_title": title, "raw_threads": raw_data}
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                threads += len(raw_data)
+
+        instrumentation.record_output(output_path, threads)
+        print(f"JSONL saved to {output_path}")
+        return
+
+    all_raw_data = {}
+    for video_id, title, raw_data in video_comments:
         if not raw_data:
             print(f"No comments fetched for {video_id}.")
             continue
@@ -304,24 +720,176 @@ def write_comments_to_json(output_path: str, videos: list[tuple[str, str]], yt)
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(all_raw_data, f, indent=2)
 
+    instrumentation.record_output(output_path, sum(len(v["raw_threads"]) for v in all_raw_data.values()))
     print(f"JSON saved to {output_path}")
 
-def extract_youtube_comments(keywords: list[str] | None = Config.KEYWORDS) -> None:
+def write_comments_to_json(
+    output_path: str,
+    videos: list[tuple[str, str]],
+    yt,
+    streaming: bool = False,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+) -> None:
+    _write_video_comments(output_path, _iter_video_comments(videos, yt, requests_per_second), streaming)
+
+def write_comments_to_json_concurrent(
+    output_path: str,
+    videos: list[tuple[str, str]],
+    max_workers: int = MAX_WORKERS,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    client_factory=None,
+    streaming: bool = False,
+) -> None:
+    """Concurrent variant of write_comments_to_json; writes an identical file.
+
+    Up to ``max_workers`` videos are harvested at once and each page's reply
+    threads are fetched on a second pool of the same size. Every request goes
+    through one shared RateLimiter. Worker threads build their own client via
+    ``client_factory`` (defaults to build_youtube_client).
+    """
+    video_comments = _iter_video_comments_concurrent(videos, max_workers, requests_per_second, client_factory)
+    _write_video_comments(output_path, video_comments, streaming)
+
+def write_comments_incremental(
+    output_path: str,
+    videos: list[tuple[str, str]],
+    yt,
+    state: ExtractionState,
+    state_key: str,
+    concurrent: bool = False,
+    max_workers: int = MAX_WORKERS,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    client_factory=None,
+) -> None:
+    """Brings the JSONL store at ``output_path`` up to date for ``videos``.
+
+    See fetch_comments_checkpointed for the per-video resume / refresh rules.
+    Pages are appended as they arrive, so the store is compacted at the end to
+    merge each video's new threads into one record.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    limiter = RateLimiter(requests_per_second)
+    try:
+        if not concurrent:
+            attach_replies = _serial_reply_attacher(yt, limiter)
+            for video_id, title in videos:
+                print(f"Fetching raw comments for video {video_id} | {title} ...")
+                fetch_comments_checkpointed(
+                    yt, video_id, title, output_path, state, state_key, attach_replies, limiter
+                )
+        else:
+            def harvest(video_id, title):
+                print(f"Fetching raw comments for video {video_id} | {title} ...")
+                attach_replies = _concurrent_reply_attacher(reply_pool, limiter, client_factory)
+                return fetch_comments_checkpointed(
+                    _thread_client(client_factory), video_id, title, output_path,
+                    state, state_key, attach_replies, limiter,
+                )
+
+            with cancel_on_timeout(ThreadPoolExecutor(max_workers, thread_name_prefix="yt-replies")) as reply_pool, \
+                 cancel_on_timeout(ThreadPoolExecutor(max_workers, thread_name_prefix="yt-videos")) as video_pool:
+                for future in [video_pool.submit(instrumentation.bind(harvest), vid, title) for vid, title in videos]:
+                    future.result()
+    finally:
+        # Progress is only saved periodically; write whatever is left, even on failure
+        state.save()
+
+    if os.path.exists(output_path):
+        compact_comments_jsonl(output_path)
+    print(f"JSONL store updated at {output_path}")
+
+def _plan_incremental_videos(
+    state: ExtractionState, state_key: str, found: list[tuple[str, str]]
+) -> list[tuple[str, str]]:
+    """Known videos (to refresh or resume) followed by newly found ones."""
+    known = [(vid, entry.get("title", "")) for vid, entry in state.output(state_key)["videos"].items()]
+    known_ids = {vid for vid, _ in known}
+    new = [(vid, title) for vid, title in found if vid not in known_ids]
+    # Register new videos before the search watermark moves past them
+    for vid, title in new:
+        state.video(state_key, vid, title)
+    state.save()
+    print(f"Incremental plan for {state_key}: {len(known)} known videos, {len(new)} new.")
+    return known + new
+
+def extract_youtube_comments(
+    keywords: list[str] | None = Config.KEYWORDS,
+    concurrent: bool = False,
+    max_workers: int = MAX_WORKERS,
+    requests_per_second: float = REQUESTS_PER_SECOND,
+    streaming: bool = False,
+    incremental: bool = False,
+    client_factory=None,
+) -> None:
+    """Harvests channel and global comments into ``data/raw/yt_comments``.
+
+    ``incremental`` keeps a checkpoint in STATE_FILE and JSONL stores: cached
+    channel IDs are reused, searches only cover videos published since the
+    last run (hits still below the view/comment thresholds are rechecked on
+    later runs), and known videos are resumed or refreshed past their newest
+    stored comment. An existing ``.json`` store seeds the first such run.
+    Comment requests are held to ``requests_per_second`` in serial and
+    concurrent runs alike. Clients come from ``client_factory`` (default:
+    build_youtube_client), one for the main thread and one per worker thread.
+    """
     if keywords is None:
         print("Must provide keywords")
         return
 
-    yt = build_youtube_client()
-
-    channel_videos = _collect_videos_from_channels(yt, keywords)
-    channel_output = os.path.join(Config.RAW_DATA_DIR, "yt_comments", "matched_comments.json")
-    write_comments_to_json(channel_output, channel_videos, yt)
+    client_factory = client_factory or build_youtube_client
+    yt = client_factory()
+    comments_dir = os.path.join(Config.RAW_DATA_DIR, "yt_comments")
+    state = ExtractionState(os.path.join(comments_dir, STATE_FILE)) if incremental else None
+    ext = "jsonl" if streaming or incremental else "json"
+
+    def last_searched_at(name):
+        if state is None:
+            return None
+        seed_state_from_store(
+            state, name,
+            os.path.join(comments_dir, f"{name}.jsonl"),
+            os.path.join(comments_dir, f"{name}.json"),
+        )
+        return state.output(name).get("searched_at")
+
+    def write_comments(name, videos, searched_at):
+        output_path = os.path.join(comments_dir, f"{name}.{ext}")
+        if incremental:
+            videos = _plan_incremental_videos(state, name, videos)
+            state.set_searched_at(name, searched_at)
+            write_comments_incremental(
+                output_path, videos, yt, state, name, concurrent, max_workers, requests_per_second,
+                client_factory=client_factory,
+            )
+        elif concurrent:
+            write_comments_to_json_concurrent(
+                output_path, videos, max_workers, requests_per_second,
+                client_factory=client_factory, streaming=streaming,
+            )
+        else:
+            write_comments_to_json(output_path, videos, yt, streaming, requests_per_second)
+
+    searched_at = _build_rfc3339_window(0)[1]
+    channel_videos = _collect_videos_from_channels(
+        yt, keywords, state, last_searched_at("matched_comments"), state_key="matched_comments"
+    )
+    write_comments("matched_comments", channel_videos, searched_at)
 
+    searched_at = _build_rfc3339_window(0)[1]
     global_videos = _collect_videos_globally(
         yt,
         query="Pakistan Solar",
         title_keywords=["Pakistan", "Solar"],
         timeframe_days=365,
+        published_after=last_searched_at("global_pakistan_solar_comments"),
+        exclude={vid for vid, _ in channel_videos},
+        client_factory=client_factory,
+        state=state,
+        state_key="global_pakistan_solar_comments",
     )
-    global_output = os.path.join(Config.RAW_DATA_DIR, "yt_comments", "global_pakistan_solar_comments.json")
-    write_comments_to_json(global_output, global_videos, yt)
\ No newline at end of file
+    write_comments("global_pakistan_solar_comments", global_videos, searched_at)
+
+    get_scheduler().save()
+    print(f"API response cache: {get_response_cache().stats()}")
+    print(f"API quota usage: {get_scheduler().metrics()}")
@@ -1,11 +1,24 @@
 import os
-import pandas as pd
-import kagglehub
+import shutil
+import zipfile
 from config.settings import Config
+from extractload.downloads import download_file
+
+KAGGLE_DOWNLOAD_URL = "https://www.kaggle.com/api/v1/datasets/download/{dataset_id}"
+
+def _unpack(archive_path: str, output_dir: str) -> None:
+    """Extracts next to ``output_dir`` and swaps it in, so readers never see half a dataset."""
+    tmp_dir = output_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    with zipfile.ZipFile(archive_path) as archive:
+        archive.extractall(tmp_dir)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
 
 def extract_solar_data_kaggle():
     Config.ensure_directories()
     print("\n--- Starting Public Dataset Extraction (Kaggle) ---")
+    headers = {"Authorization": f"Bearer {Config.KAGGLE_API_TOKEN}"}
 
     datasets = {
         'pakistan-electricity-generation-by-solar-kaggle': 'ahmadwaleed1/pakistan-electricity-generation-by-solar',
@@ -15,18 +28,21 @@ def extract_solar_data_kaggle():
     for file_name, dataset_id in datasets.items():
         if not dataset_id:
             continue
-            
+
+        # The archive is kept beside the extracted folder; its ETag/checksum
+        # let the next run skip the transfer when the dataset has not changed.
+        output_dir = os.path.join(Config.RAW_DATA_DIR, file_name)
+        archive_path = output_dir + ".zip"
         print(f"Downloading {dataset_id}...")
         try:
-            kagglehub.dataset_download(
-                dataset_id, 
-                output_dir=os.path.join(Config.RAW_DATA_DIR, file_name),
-                force_download=True
-            )
-            print(f"Successfully downloaded {dataset_id} to {Config.RAW_DATA_DIR}")
-            
-            
+            status = download_file(KAGGLE_DOWNLOAD_URL.format(dataset_id=dataset_id), archive_path, headers=headers)
+            if status == "downloaded" or not os.path.isdir(output_dir):
+                _unpack(archive_path, output_dir)
+                print(f"Successfully downloaded {dataset_id} to {Config.RAW_DATA_DIR}")
+            else:
+                print(f"{dataset_id} is unchanged; keeping {output_dir}")
+
         except Exception as e:
             print(f"Error downloading {dataset_id}: {e}")
 
-    return None
\ No newline at end of file
+    return None
@@ -1,9 +1,159 @@
 import os
-import yfinance as yf
+import glob
+import time
+import numpy as np
 import pandas as pd
 from config.settings import Config
+from pipeline import instrumentation
 
-def extract_stock_data(tickers=None, start='2018-01-01', end=None, interval='1d'):
+# CONSTANTS
+ADJUSTED_FIELDS, ADJUSTMENT_RTOL = ('Open', 'High', 'Low', 'Close'), 1e-6
+
+def _store_path(output_dir, ticker, interval):
+    # Keeps the stock_{ticker}_... naming the notebook splits on
+    return os.path.join(output_dir, f"stock_{ticker}_{interval}.csv")
+
+def _read_raw_stock_csv(path):
+    df = pd.read_csv(path, header=[0, 1], index_col=0)
+    df.index = pd.to_datetime(df.index)
+    df.index.name = 'Date'
+    return df
+
+def _load_ticker_store(output_dir, ticker, interval):
+    """Returns the ticker's stored bars, folding any legacy date-range files into them.
+
+    Legacy ``stock_{t}_{start}_to_{end}.csv`` downloads are merged into the
+    store and removed once it has been written, so the directory ends up with
+    one file per ticker.
+    """
+    path = _store_path(output_dir, ticker, interval)
+    frames = [_read_raw_stock_csv(path)] if os.path.exists(path) else []
+
+    legacy = sorted(glob.glob(os.path.join(output_dir, f"stock_{glob.escape(ticker)}_*_to_*.csv"))) if interval == '1d' else []
+    frames.extend(_read_raw_stock_csv(f) for f in legacy)
+
+    if not frames:
+        return None, legacy
+    return _merge_bars(frames), legacy
+
+def _merge_bars(frames):
+    df = pd.concat(frames)
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df
+
+def _write_store(df, path):
+    tmp_path = path + ".tmp"
+    df.to_csv(tmp_path)
+    os.replace(tmp_path, path)
+    instrumentation.record_output(path, len(df))
+
+def _adjustment_changed(stored, fresh, rtol=ADJUSTMENT_RTOL):
+    """True when re-fetched bars disagree with the stored ones on the dates both have.
+
+    yf.download back-adjusts prices for dividends and splits, so after a
+    corporate action every earlier bar changes and the store can no longer be
+    extended. The store's last bar is left out: it may have been written
+    mid-session.
+    """
+    overlap = stored.index[:-1].intersection(fresh.index)
+    cols = [c for c in stored.columns if c[0] in ADJUSTED_FIELDS and c in fresh.columns]
+    if overlap.empty or not cols:
+        return False
+    old = stored.loc[overlap, cols].to_numpy(dtype=float)
+    new = fresh.loc[overlap, cols].to_numpy(dtype=float)
+    return not np.allclose(old, new, rtol=rtol, equal_nan=True)
+
+def _download_batch(yf, group, start, end, interval, errors):
+    print(f"Downloading {len(group)} tickers ({start} -> {end}) in one batch...")
+    started = time.perf_counter()
+    try:
+        with instrumentation.timer("yf.download"):
+            batch = yf.download(
+                group, start=start, end=end, interval=interval,
+                group_by='column', progress=False, threads=True,
+            )
+    except Exception as e:
+        print(f"Failed to download batch {group}: {e}")
+        errors.update({t: str(e) for t in group})
+        instrumentation.count("download_errors", len(group))
+        return None
+    instrumentation.log_event(
+        "yf_download", tickers=group, start=start, end=end,
+        rows=0 if batch is None else len(batch), seconds=round(time.perf_counter() - started, 3),
+    )
+    return batch
+
+def _extract_stock_data_incremental(tickers, start, end, interval, output_dir):
+    """Batched refresh: one yf.download per distinct start date, appended to per-ticker stores.
+
+    Each ticker resumes from its second-to-last stored bar. The last bar is
+    replaced (it may have been partial) and the one before it must match what
+    was stored; if it does not, Yahoo has re-adjusted the history for a
+    dividend or split and the ticker's full history from ``start`` is pulled
+    again and replaces the store. Tickers without a store start at
+    ``start``. On a daily run every ticker shares a start, so the whole
+    refresh is a single request.
+    """
+    import yfinance as yf  # slow import; only paid by runs that download
+    files, errors, rows_added, readjusted = [], {}, {}, []
+    stores, legacy_files, groups = {}, {}, {}
+
+    for t in tickers:
+        stores[t], legacy_files[t] = _load_ticker_store(output_dir, t, interval)
+        if stores[t] is None:
+            groups.setdefault(start, []).append(t)
+            continue
+        if stores[t].index.max().strftime('%Y-%m-%d') >= end:
+            print(f"{t} is up to date.")
+            continue
+        t_start = stores[t].index[-2 if len(stores[t]) > 1 else -1].strftime('%Y-%m-%d')
+        groups.setdefault(t_start, []).append(t)
+
+    def store_bars(t, batch, replace):
+        if batch is None or batch.empty or t not in batch.columns.get_level_values('Ticker'):
+            print(f"No data for {t}")
+            errors[t] = "no data"
+            return
+        new = batch.xs(t, axis=1, level='Ticker', drop_level=False).dropna(how='all')
+        new.index.name = 'Date'
+        if not replace and stores[t] is not None and _adjustment_changed(stores[t], new):
+            print(f"{t}: stored prices no longer match Yahoo's adjusted history; re-pulling from {start}.")
+            readjusted.append(t)
+            return
+        previous = 0 if stores[t] is None else len(stores[t])
+        merged = new if replace or stores[t] is None else _merge_bars([stores[t], new])
+        rows_added[t] = len(merged) - previous
+
+        path = _store_path(output_dir, t, interval)
+        _write_store(merged, path)
+        files.append(path)
+        print(f"{t}: {rows_added[t]:+} bars, {len(merged)} stored in {path}")
+
+    for t_start, group in sorted(groups.items()):
+        batch = _download_batch(yf, group, t_start, end, interval, errors)
+        if batch is not None:
+            for t in group:
+                store_bars(t, batch, replace=False)
+
+    if readjusted:
+        instrumentation.count("stock_readjustments", len(readjusted))
+        batch = _download_batch(yf, readjusted, start, end, interval, errors)
+        if batch is not None:
+            for t in readjusted:
+                store_bars(t, batch, replace=True)
+
+    # Legacy date-range copies are redundant once the merged store is on disk
+    for t, legacy in legacy_files.items():
+        path = _store_path(output_dir, t, interval)
+        if legacy and path not in files and stores[t] is not None:
+            _write_store(stores[t], path)
+        if os.path.exists(path):
+            for f in legacy:
+                os.remove(f)
+
+    return {"files": files, "errors": errors, "rows_added": rows_added, "readjusted": readjusted}
+
+def extract_stock_data(tickers=None, start='2018-01-01', end=None, interval='1d', incremental=False):
     Config.ensure_directories()
 
     if tickers is None:
@@ -18,10 +168,20 @@ def extract_stock_data(tickers=None, start='2018-01-01', end=None, interval='1d'
     output_dir = os.path.join(Config.RAW_DATA_DIR, 'yahoo_finance')
     os.makedirs(output_dir, exist_ok=True)
 
+    if incremental:
+        return _extract_stock_data_incremental(tickers, start, end, interval, output_dir)
+
+    import yfinance as yf
     for t in tickers:
         try:
             print(f"Downloading {t} ({start} -> {end})...")
-            df = yf.download(t, start=start, end=end, interval=interval, progress=False)
+            started = time.perf_counter()
+            with instrumentation.timer("yf.download"):
+                df = yf.download(t, start=start, end=end, interval=interval, progress=False)
+            instrumentation.log_event(
+                "yf_download", tickers=[t], start=start, end=end,
+                rows=0 if df is None else len(df), seconds=round(time.perf_counter() - started, 3),
+            )
 
             if df is None or df.empty:
                 print(f"No data for {t}")
@@ -32,10 +192,12 @@ def extract_stock_data(tickers=None, start='2018-01-01', end=None, interval='1d'
             path = os.path.join(output_dir, fname)
 
             df.to_csv(path)
+            instrumentation.record_output(path, len(df))
             files.append(path)
             print(f"Saved raw payload to {path}")
         except Exception as e:
             print(f"Failed to download {t}: {e}")
             errors[t] = str(e)
+            instrumentation.count("download_errors")
 
     return {"files": files, "errors": errors}
@@ -0,0 +1,170 @@
+import os
+import re
+import csv
+import json
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from extractload.downloads import file_sha256
+from pipeline import instrumentation
+from pipeline.dag import cancel_on_timeout
+
+# CONSTANTS
+CACHE_DIR, PARSER_VERSION, PAGES_PER_TASK = ".page_cache", 1, 4
+
+TITLE_RE = re.compile(r"^\s*Table\s*(?:No\.?\s*)?(\d+(?:\.\d+)?)\b", re.IGNORECASE | re.MULTILINE)
+NUMBER_RE = re.compile(r"^-?[\d,]*\.?\d+%?$")
+
+def table_number(template_name: str) -> str:
+    """``table_4_7_electricity_...csv`` -> ``"4.7"``; ``table_1_share_...csv`` -> ``"1"``."""
+    match = re.match(r"table_(\d+)(?:_(\d+))?_", template_name)
+    if not match:
+        raise ValueError(f"Template name has no table number: {template_name}")
+    return ".".join(g for g in match.groups() if g)
+
+def _clean_cell(cell) -> str:
+    return " ".join(str(cell).split()) if cell is not None else ""
+
+def _parse_pages(task: tuple[str, list[int]]) -> list[dict]:
+    """Worker: titles and tables of each page, skipping table detection on untitled pages."""
+    import pdfplumber
+
+    pdf_path, page_numbers = task
+    out = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for number in page_numbers:
+            page = pdf.pages[number]
+            titles = TITLE_RE.findall(page.extract_text() or "")
+            tables = page.extract_tables() if titles else []
+            out.append({
+                "page": number,
+                "titles": titles,
+                "tables": [[[_clean_cell(c) for c in row] for row in table] for table in tables],
+            })
+    return out
+
+def parse_pdf_pages(pdf_path: str, cache_root: str, max_workers: int | None = None) -> list[dict]:
+    """Per-page parse results, cached in ``cache_root/.page_cache/<pdf sha256>-v<n>/``.
+
+    Only pages missing from the cache are parsed, in chunks spread over a
+    process pool, so re-running against the same PDF reads JSON only.
+    """
+    import pdfplumber
+
+    cache_dir = os.path.join(cache_root, CACHE_DIR, f"{file_sha256(pdf_path)}-v{PARSER_VERSION}")
+    os.makedirs(cache_dir, exist_ok=True)
+    with pdfplumber.open(pdf_path) as pdf:
+        n_pages = len(pdf.pages)
+
+    def cache_file(number):
+        return os.path.join(cache_dir, f"page_{number}.json")
+
+    missing = [n for n in range(n_pages) if not os.path.exists(cache_file(n))]
+    instrumentation.count("pdf_pages", n_pages)
+    instrumentation.count("pdf_pages_parsed", len(missing))
+    if missing:
+        tasks = [(pdf_path, missing[i:i + PAGES_PER_TASK]) for i in range(0, len(missing), PAGES_PER_TASK)]
+        max_workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+        print(f"Parsing {len(missing)} of {n_pages} PDF pages on {max_workers} processes...")
+        if max_workers > 1:
+            with cancel_on_timeout(ProcessPoolExecutor(max_workers)) as pool:
+                parsed = [p for chunk in pool.map(_parse_pages, tasks) for p in chunk]
+        else:
+            parsed = [p for task in tasks for p in _parse_pages(task)]
+        for result in parsed:
+            tmp_path = cache_file(result["page"]) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, cache_file(result["page"]))
+
+    pages = []
+    for number in range(n_pages):
+        with open(cache_file(number), "r", encoding="utf-8") as f:
+            pages.append(json.load(f))
+    return pages
+
+def _fit_rows(table: list[list[str]], headers: list[str]) -> list[list[str]]:
+    """Keeps data rows (any numeric cell) that have exactly the template's width.
+
+    Only trailing empty cells are trimmed to reach it. A row with an empty
+    cell in the middle is skipped rather than compacted, because closing
+    the gap would shift its values into the wrong columns.
+
+    Grouped tables (e.g. 4.7 "Source\\State") print the group label once per
+    block, either on its own row or on the block's first row; it is carried
+    down into the label column of the rows below.
+    """
+    rows, width, label = [], len(headers), ""
+    for row in table:
+        if row and row[0] and row[0] != headers[0]:
+            label = row[0]
+        if not any(NUMBER_RE.match(c) for c in row[1:]):
+            continue  # title, header, unit or group-label rows
+        if not row[0] and label:
+            row = [label] + row[1:]
+        while len(row) > width and not row[-1]:
+            row = row[:-1]
+        if len(row) != width:
+            continue
+        rows.append(row)
+    return rows
+
+def find_table(pages: list[dict], number: str, headers: list[str]) -> list[list[str]]:
+    """Rows of table ``number`` across every page titled with it (continuations included).
+
+    On each page the table whose rows best fit the template schema wins.
+    """
+    rows = []
+    for page in pages:
+        if number not in page["titles"]:
+            continue
+        candidates = [_fit_rows(table, headers) for table in page["tables"]]
+        if candidates:
+            rows.extend(max(candidates, key=len))
+    return rows
+
+def has_data_rows(path: str) -> bool:
+    """True when the CSV at ``path`` exists and has anything below its header."""
+    if not os.path.exists(path):
+        return False
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return any(any(cell.strip() for cell in row) for row in itertools.islice(csv.reader(f), 1, None))
+
+def extract_pbs_tables(
+    pdf_path: str,
+    output_dir: str,
+    templates: dict[str, list[str]],
+    max_workers: int | None = None,
+    force: bool = False,
+) -> dict[str, int]:
+    """Fills each CSV template with its table from the PBS PDF.
+
+    Returns ``{template_name: rows_written}``; templates whose table was not
+    found are left out and their files are not touched. Neither are CSVs
+    that already hold data (earlier extractions or hand-filled tables)
+    unless ``force``, so a mis-parse cannot overwrite them.
+    """
+    pending = {
+        name: headers for name, headers in templates.items()
+        if force or not has_data_rows(os.path.join(output_dir, name))
+    }
+    for name in templates.keys() - pending.keys():
+        print(f"Keeping {name}: it already has data (force=True re-extracts it).")
+    if not pending:
+        return {}
+
+    pages = parse_pdf_pages(pdf_path, output_dir, max_workers)
+    written = {}
+    for name, headers in pending.items():
+        rows = find_table(pages, table_number(name), headers)
+        if not rows:
+            continue
+        path = os.path.join(output_dir, name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
+        os.replace(tmp_path, path)
+        instrumentation.record_output(path, len(rows))
+        written[name] = len(rows)
+    return written
@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import atexit
+import heapq
+import random
+import itertools
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from config.settings import Config
+from pipeline import instrumentation
+from pipeline.dag import check_cancelled
+
+# CONSTANTS
+QUOTA_FILE, RESERVE_UNITS, MAX_RETRIES, MAX_RETRY_DELAY = "yt_quota.json", 500, 5, 60
+SAVE_EVERY_UNITS = 100
+
+# Units charged per call, from the YouTube Data API v3 quota table.
+QUOTA_COSTS = {
+    "youtube.search.list": 100,
+    "youtube.channels.list": 1,
+    "youtube.videos.list": 1,
+    "youtube.commentThreads.list": 1,
+    "youtube.comments.list": 1,
+}
+
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+
+def _quota_day() -> str:
+    """YouTube quota resets at midnight Pacific time."""
+    try:
+        tz = ZoneInfo("America/Los_Angeles")
+    except ZoneInfoNotFoundError:
+        tz = timezone(timedelta(hours=-8))
+    return datetime.now(tz).date().isoformat()
+
+def classify_api_error(exc: Exception) -> str:
+    """Returns "quota", "retry" or "fatal" for an exception raised by ``execute()``.
+
+    Anything without an HTTP status (socket errors, timeouts) is retryable.
+    """
+    status = getattr(getattr(exc, "resp", None), "status", None)
+    if status is None:
+        return "retry"
+
+    reasons = {d.get("reason") for d in getattr(exc, "error_details", None) or [] if isinstance(d, dict)}
+    if not reasons:
+        try:
+            payload = json.loads(getattr(exc, "content", b"") or b"{}")
+            reasons = {e.get("reason") for e in payload.get("error", {}).get("errors", [])}
+        except (ValueError, AttributeError):
+            pass
+
+    status = int(status)
+    if status == 403 and reasons & QUOTA_REASONS:
+        return "quota"
+    if status == 429 or status >= 500 or reasons & RATE_LIMIT_REASONS:
+        return "retry"
+    return "fatal"
+
+class RateLimiter:
+    """Token bucket shared by worker threads; cheaper callers are served first.
+
+    Waiting threads queue on ``priority`` (the call's quota cost), so a backlog
+    of 1-unit comment pages is never starved behind 100-unit searches.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+
+    def acquire(self, priority: int = 0) -> None:
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._waiters[0] == ticket and self._tokens >= 1:
+                    heapq.heappop(self._waiters)
+                    self._tokens -= 1
+                    self._cond.notify_all()
+                    return
+                wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.05
+                self._cond.wait(timeout=wait)
+
+class QuotaScheduler:
+    """Single gate for YouTube calls: daily quota budget, retries and metrics.
+
+    Spent units are persisted per quota day in ``state_path`` so separate runs
+    on the same day share one budget. The file is rewritten once every
+    ``save_every`` units and by ``save()`` (the default scheduler also saves
+    at exit), never under the lock that admits calls. Calls costing more than one unit are
+    refused once they would dip into ``reserve_units``, keeping the tail of
+    the budget for cheap comment pages. A 403 quota error stops all further
+    calls for the run; 429/5xx and network errors are retried with jittered
+    exponential backoff; anything else fails the call without retrying.
+    Every refused or failed call returns None, as callers already expect.
+    """
+
+    def __init__(
+        self,
+        daily_budget: int | None = None,
+        reserve_units: int = RESERVE_UNITS,
+        max_retries: int = MAX_RETRIES,
+        max_delay: float = MAX_RETRY_DELAY,
+        state_path: str | None = None,
+        save_every: int = SAVE_EVERY_UNITS,
+    ):
+        self.daily_budget = Config.YOUTUBE_DAILY_QUOTA if daily_budget is None else daily_budget
+        self.reserve_units = reserve_units
+        self.max_retries = max_retries
+        self.max_delay = max_delay
+        self.state_path = state_path
+        self.save_every = save_every
+        self.exhausted = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._metrics = defaultdict(lambda: defaultdict(float))
+        self._day, self.spent = _quota_day(), 0
+        if state_path and os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("day") == self._day:
+                self.spent = saved.get("spent", 0)
+        self._saved = (self._day, self.spent)
+
+    @property
+    def remaining(self) -> int:
+        return self.daily_budget - self.spent
+
+    def save(self) -> None:
+        """Writes the current day's spend to ``state_path`` if it changed."""
+        if not self.state_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                current = (self._day, self.spent)
+            if current == self._saved:
+                return
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"day": current[0], "spent": current[1]}, f)
+            os.replace(tmp_path, self.state_path)
+            self._saved = current
+
+    def _admit(self, endpoint: str, cost: int) -> bool:
+        with self._lock:
+            day = _quota_day()
+            if day != self._day:
+                self._day, self.spent, self.exhausted = day, 0, False
+
+            stats = self._metrics[endpoint]
+            if self.exhausted:
+                stats["skipped"] += 1
+                instrumentation.count("api_skipped")
+                return False
+            if cost > self.remaining or (cost > 1 and self.remaining - cost < self.reserve_units):
+                if not stats["skipped"]:
+                    print(f"[quota] {self.remaining} units left; skipping {endpoint} ({cost} units).")
+                stats["skipped"] += 1
+                instrumentation.count("api_skipped")
+                return False
+
+            self.spent += cost
+            stats["calls"] += 1
+            stats["units"] += cost
+            saved_day, saved_spent = self._saved
+            save_due = saved_day != self._day or self.spent - saved_spent >= self.save_every
+        if save_due:
+            self.save()
+        instrumentation.count("api_calls")
+        instrumentation.count(f"api_calls.{endpoint}")
+        instrumentation.count("quota_units", cost)
+        return True
+
+    def _backoff(self, exc: Exception, attempt: int, base_delay: float) -> float:
+        retry_after = getattr(getattr(exc, "resp", None), "get", lambda _: None)("retry-after")
+        if retry_after and str(retry_after).isdigit():
+            return min(self.max_delay, float(retry_after))
+        return random.uniform(0, min(self.max_delay, base_delay * 2 ** attempt))
+
+    def execute(self, endpoint: str, call, limiter: RateLimiter | None = None, base_delay: float = 1.0):
+        """Runs ``call()`` under the budget; returns its response or None."""
+        cost = QUOTA_COSTS.get(endpoint, 1)
+        for attempt in range(self.max_retries + 1):
+            check_cancelled()
+            if not self._admit(endpoint, cost):
+                return None
+            if limiter is not None:
+                limiter.acquire(priority=cost)
+
+            started = time.monotonic()
+            try:
+                resp = call()
+            except Exception as e:
+                kind = classify_api_error(e)
+                with self._lock:
+                    stats = self._metrics[endpoint]
+                    stats["seconds"] += time.monotonic() - started
+                    stats[f"{kind}_errors"] += 1
+                    if kind == "quota":
+                        self.exhausted = True
+                instrumentation.count(f"api_errors.{kind}")
+                instrumentation.log_event("api_error", endpoint=endpoint, kind=kind, attempt=attempt, error=str(e))
+
+                if kind == "quota":
+                    print(f"[quota] Daily quota exhausted on {endpoint}: {e}. Stopping API calls.")
+                    return None
+                if kind == "fatal":
+                    print(f"API error on {endpoint}: {e}. Not retrying.")
+                    return None
+                if attempt == self.max_retries:
+                    break
+
+                delay = self._backoff(e, attempt, base_delay)
+                print(f"API error on {endpoint}: {e}. Retrying in {delay:.1f}s...")
+                with self._lock:
+                    self._metrics[endpoint]["retries"] += 1
+                instrumentation.count("api_retries")
+                time.sleep(delay)
+                continue
+
+            elapsed = time.monotonic() - started
+            instrumentation.add_time(endpoint, elapsed)
+            with self._lock:
+                stats = self._metrics[endpoint]
+                stats["seconds"] += elapsed
+                stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            return resp
+
+        print(f"Failed to process {endpoint} after {self.max_retries + 1} attempts.")
+        return None
+
+    def metrics(self) -> dict:
+        """Per-endpoint calls, quota units, latency and error counts."""
+        with self._lock:
+            out = {}
+            for endpoint, stats in sorted(self._metrics.items()):
+                row = {k: (round(v, 3) if k.endswith("seconds") else int(v)) for k, v in stats.items()}
+                calls = stats["calls"]
+                row["avg_seconds"] = round(stats["seconds"] / calls, 3) if calls else 0.0
+                out[endpoint] = row
+            return {"spent_units": self.spent, "remaining_units": self.remaining, "endpoints": out}
+
+_default_scheduler: QuotaScheduler | None = None
+_default_lock = threading.Lock()
+
+def get_scheduler() -> QuotaScheduler:
+    """Process-wide scheduler persisting its spend to ``data/raw/yt_quota.json``."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = QuotaScheduler(state_path=os.path.join(Config.RAW_DATA_DIR, QUOTA_FILE))
+            atexit.register(_default_scheduler.save)
+        return _default_scheduler
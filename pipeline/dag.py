@@ -0,0 +1,183 @@
+import time
+import queue
+import importlib
+import threading
+import traceback
+import contextvars
+
+def lazy(target: str):
+    """``"package.module:function"`` as a callable that imports the module on first call.
+
+    Keeps a stage's dependencies (pandas, yfinance, googleapiclient, ...) out
+    of the CLI's startup path until that stage actually runs.
+    """
+    module_name, func_name = target.split(":")
+
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module_name), func_name)(*args, **kwargs)
+
+    call.__qualname__ = call.__name__ = func_name
+    return call
+
+class StageCancelled(RuntimeError):
+    """Raised inside a stage whose timeout expired, so its work stops at the next check."""
+
+class _StageControl:
+    """Cancellation state of one running stage: a flag plus the executors it opened."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.event = threading.Event()
+        self._executors = []
+        self._lock = threading.Lock()
+
+    def register(self, executor) -> None:
+        with self._lock:
+            self._executors.append(executor)
+            cancelled = self.event.is_set()
+        if cancelled:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.event.set()
+            executors = list(self._executors)
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+_control = contextvars.ContextVar("stage_control", default=None)
+
+def cancel_on_timeout(executor):
+    """Registers ``executor`` with the current stage and returns it.
+
+    If the stage times out, the executor is shut down with its queued work
+    cancelled, so abandoned work does not keep running (and keep the
+    interpreter from exiting, which joins pool workers). Outside a stage
+    this does nothing.
+    """
+    control = _control.get()
+    if control is not None:
+        control.register(executor)
+    return executor
+
+def check_cancelled() -> None:
+    """Raises StageCancelled if the current stage timed out; long loops call it between units of work."""
+    control = _control.get()
+    if control is not None and control.event.is_set():
+        raise StageCancelled(f"stage {control.name} was cancelled after its timeout")
+
+class Stage:
+    """A named pipeline step with the stages it must wait for and an optional timeout (seconds)."""
+
+    def __init__(self, name: str, fn, deps: tuple[str, ...] = (), timeout: float | None = None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={list(self.deps)}, timeout={self.timeout})"
+
+def select_stages(
+    stages: list[Stage], only: list[str] | None = None, skip: list[str] | None = None
+) -> list[Stage]:
+    """Filters stages by name, keeping declaration order. Unknown names raise ValueError."""
+    names = {s.name for s in stages}
+    unknown = sorted(set(only or []) - names | set(skip or []) - names)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}. Known: {', '.join(s.name for s in stages)}")
+
+    return [s for s in stages if (not only or s.name in only) and s.name not in (skip or [])]
+
+def _validate(stages: list[Stage]) -> None:
+    by_name = {s.name: s for s in stages}
+    visiting, done = set(), set()
+
+    def visit(name, path):
+        if name in done or name not in by_name:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for s in stages:
+        visit(s.name, [])
+
+def run_stages(stages: list[Stage], max_workers: int | None = None) -> dict[str, dict]:
+    """Runs stages concurrently as soon as their dependencies have succeeded.
+
+    Dependencies on stages that are not in ``stages`` (e.g. filtered out with
+    ``--only``/``--skip``) count as already satisfied. A stage that fails or
+    times out only skips its own dependents; everything else keeps going.
+    Threads cannot be killed, so a timed-out stage is cancelled cooperatively.
+    Its executors registered with ``cancel_on_timeout`` drop their queued
+    work, and API calls and downloads raise StageCancelled at their next
+    ``check_cancelled()``. Work already in flight (one request, one PDF page)
+    still finishes, so the process may outlive this function by that long.
+
+    Returns ``{name: {"status", "seconds", "error"}}`` with status one of
+    "ok", "failed", "timeout" or "skipped".
+    """
+    if max_workers is not None and max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+    _validate(stages)
+    by_name = {s.name: s for s in stages}
+    pending = dict(by_name)
+    results, running, controls = {}, {}, {}
+    done_q = queue.Queue()
+
+    def worker(stage, control):
+        _control.set(control)
+        try:
+            stage.fn()
+            done_q.put((stage.name, "ok", None))
+        except BaseException as e:
+            traceback.print_exc()
+            done_q.put((stage.name, "failed", f"{type(e).__name__}: {e}"))
+
+    def finish(name, status, error=None):
+        started = running.pop(name, None)
+        seconds = round(time.monotonic() - started, 3) if started is not None else 0.0
+        results[name] = {"status": status, "seconds": seconds, "error": error}
+        print(f"[stage] {name}: {status} in {seconds}s" + (f" ({error})" if error else ""))
+
+    while pending or running:
+        for name, stage in list(pending.items()):
+            deps = [d for d in stage.deps if d in by_name]
+            if any(d in results and results[d]["status"] != "ok" for d in deps):
+                del pending[name]
+                finish(name, "skipped", "upstream stage did not succeed")
+            elif all(d in results for d in deps) and (max_workers is None or len(running) < max_workers):
+                del pending[name]
+                print(f"[stage] {name}: started")
+                running[name] = time.monotonic()
+                controls[name] = _StageControl(name)
+                threading.Thread(target=worker, args=(stage, controls[name]), name=f"stage-{name}", daemon=True).start()
+
+        if not running:
+            continue
+
+        deadlines = {
+            name: started + by_name[name].timeout
+            for name, started in running.items()
+            if by_name[name].timeout is not None
+        }
+        wait = max(0.0, min(deadlines.values()) - time.monotonic()) if deadlines else None
+        try:
+            name, status, error = done_q.get(timeout=wait)
+            if name in running:
+                finish(name, status, error)
+        except queue.Empty:
+            pass
+
+        now = time.monotonic()
+        for name, deadline in deadlines.items():
+            if name in running and now >= deadline:
+                controls[name].cancel()
+                finish(name, "timeout", f"exceeded {by_name[name].timeout:g}s")
+
+    return results
@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import cProfile
+import threading
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# CONSTANTS
+MAIN_STAGE = "main"
+
+_stage = contextvars.ContextVar("stage", default=MAIN_STAGE)
+
+class RunRecorder:
+    """Counters, timers and events of one pipeline run, grouped by stage.
+
+    The stage is taken from a context variable set by ``instrumented``, so
+    extractors and transforms report without being passed anything. Events
+    are structured log records; with ``events_path`` they are also appended
+    to that file as JSON lines while the run goes.
+    """
+
+    def __init__(self, run_id: str, events_path: str | None = None):
+        self.run_id = run_id
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.events_path = events_path
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: defaultdict(int))
+        self._timers = defaultdict(lambda: defaultdict(lambda: {"count": 0, "seconds": 0.0, "max_seconds": 0.0}))
+        self._events = defaultdict(int)
+        self._events_file = None
+        if events_path:
+            os.makedirs(os.path.dirname(events_path), exist_ok=True)
+            self._events_file = open(events_path, "a", encoding="utf-8")
+
+    def count(self, name: str, value: int | float = 1) -> None:
+        with self._lock:
+            self._counters[_stage.get()][name] += value
+
+    def add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timer = self._timers[_stage.get()][name]
+            timer["count"] += 1
+            timer["seconds"] += seconds
+            timer["max_seconds"] = max(timer["max_seconds"], seconds)
+
+    def event(self, event: str, **fields) -> None:
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "run_id": self.run_id,
+            "stage": _stage.get(),
+            "event": event,
+            **fields,
+        }
+        with self._lock:
+            self._events[(record["stage"], event)] += 1
+            if self._events_file is not None:
+                self._events_file.write(json.dumps(record, default=str) + "\n")
+                self._events_file.flush()
+
+    def stage_metrics(self, stage: str) -> dict:
+        with self._lock:
+            counters = dict(self._counters.get(stage, {}))
+            timers = {
+                name: {"count": t["count"], "seconds": round(t["seconds"], 3), "max_seconds": round(t["max_seconds"], 3)}
+                for name, t in self._timers.get(stage, {}).items()
+            }
+            events = {event: n for (s, event), n in self._events.items() if s == stage}
+        return {
+            "api_calls": counters.pop("api_calls", 0),
+            "api_retries": counters.pop("api_retries", 0),
+            "quota_units": counters.pop("quota_units", 0),
+            "rows_written": counters.pop("rows_written", 0),
+            "bytes_written": counters.pop("bytes_written", 0),
+            "counters": dict(sorted(counters.items())),
+            "timers": dict(sorted(timers.items())),
+            "events": dict(sorted(events.items())),
+        }
+
+    def report(self, stage_results: dict[str, dict] | None = None) -> dict:
+        """The run report: DAG status and wall time per stage merged with what each stage recorded."""
+        stage_results = stage_results or {}
+        with self._lock:
+            recorded = set(self._counters) | set(self._timers) | {s for s, _ in self._events}
+        stages = {}
+        for name in list(stage_results) + sorted(recorded - set(stage_results)):
+            stages[name] = {**stage_results.get(name, {}), **self.stage_metrics(name)}
+
+        totals = defaultdict(int)
+        for metrics in stages.values():
+            for key in ("api_calls", "api_retries", "quota_units", "rows_written", "bytes_written"):
+                totals[key] += metrics[key]
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "totals": dict(totals),
+            "stages": stages,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._events_file is not None:
+                self._events_file.close()
+                self._events_file = None
+
+_recorder: RunRecorder | None = None
+
+def new_run_id() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S")
+
+def start_run(run_id: str | None = None, events_path: str | None = None) -> RunRecorder:
+    """Makes a new recorder the target of every counter, timer and event until ``end_run()``."""
+    global _recorder
+    _recorder = RunRecorder(run_id or new_run_id(), events_path)
+    return _recorder
+
+def end_run() -> RunRecorder | None:
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close()
+    return recorder
+
+def current_stage() -> str:
+    return _stage.get()
+
+# Reporting helpers; all of them are no-ops while no run is active.
+def count(name: str, value: int | float = 1) -> None:
+    if _recorder is not None:
+        _recorder.count(name, value)
+
+def log_event(event: str, **fields) -> None:
+    if _recorder is not None:
+        _recorder.event(event, **fields)
+
+def add_time(name: str, seconds: float) -> None:
+    if _recorder is not None:
+        _recorder.add_time(name, seconds)
+
+@contextmanager
+def timer(name: str):
+    """Adds the block's wall time to the current stage's ``name`` timer."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - started)
+
+def record_output(path: str, rows: int | None = None) -> None:
+    """Counts a file written by the current stage: its size, and ``rows`` if known."""
+    if _recorder is None:
+        return
+    _recorder.count("files_written")
+    _recorder.count("bytes_written", os.path.getsize(path) if os.path.exists(path) else 0)
+    if rows is not None:
+        _recorder.count("rows_written", rows)
+    _recorder.event("output", path=path, rows=rows)
+
+def bind(fn):
+    """Wraps ``fn`` to run in the caller's context, so pool threads report to the submitting stage."""
+    context = contextvars.copy_context()
+
+    def call(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+
+    return call
+
+def instrumented(name: str, fn, profile_dir: str | None = None):
+    """``fn`` run as stage ``name``: its reports are attributed to the stage.
+
+    With ``profile_dir`` the call is profiled with cProfile and the stats are
+    dumped to ``<profile_dir>/<name>.prof`` (threads the stage starts itself
+    are not included). Read them with ``python -m pstats``.
+    """
+    def call(*args, **kwargs):
+        token = _stage.set(name)
+        profiler = cProfile.Profile() if profile_dir else None
+        try:
+            log_event("stage_started")
+            if profiler is not None:
+                try:
+                    profiler.enable()
+                except ValueError as e:  # Python 3.12+ allows one active profiler per process
+                    print(f"[profile] {name}: not profiled ({e})")
+                    profiler = None
+            return fn(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+            log_event("stage_finished")
+            _stage.reset(token)
+
+    call.__qualname__ = call.__name__ = name
+    return call
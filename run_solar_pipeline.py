@@ -1,25 +1,147 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import os
+import sys
+import json
+import argparse
+from functools import partial
 from config.settings import Config
-from extractload.extract_stocks import extract_stock_data
-from extractload.extract_kaggle import extract_solar_data_kaggle
-from extractload.extract_pdf_data import get_pbs_file_and_setup_for_manual_extraction
-from extractload.extract_google import extract_youtube_comments
+from pipeline import instrumentation
+from pipeline.dag import Stage, lazy, select_stages, run_stages
+
+REPORTS_DIR = os.path.join(Config.BASE_DIR, "data", "run_reports")
+
+_update_columnar = lazy("storage.columnar:update_columnar")
+
+# Extract stages are independent of each other; each transform waits only on
+# the extract it reads from. Timeouts are in seconds. Stage modules are
+# imported when the stage starts, so `--only stocks` never loads the YouTube
+# or Kaggle clients.
+STAGES = [
+    Stage("pbs", lazy("extractload.extract_pdf_data:get_pbs_file_and_setup_for_manual_extraction"), timeout=10 * 60),
+    # Appends new bars to per-ticker stores; a ticker Yahoo re-adjusted is pulled again in full
+    Stage("stocks", partial(lazy("extractload.extract_stocks:extract_stock_data"), incremental=True), timeout=15 * 60),
+    Stage("kaggle", lazy("extractload.extract_kaggle:extract_solar_data_kaggle"), timeout=60 * 60),
+    Stage("youtube", lazy("extractload.extract_google:extract_youtube_comments"), timeout=4 * 60 * 60),
+    Stage("transform_stocks", lazy("transform.stocks:transform_stocks"), deps=("stocks",), timeout=15 * 60),
+    Stage("transform_pbs", lazy("transform.pbs:transform_pbs"), deps=("pbs",), timeout=5 * 60),
+    # Streams each city's file in chunks; float64 parsing keeps the notebook's exact means
+    Stage("transform_weather", partial(lazy("transform.solar_radiation:aggregate_solar_radiation"), value_dtype="float64"),
+          deps=("kaggle",), timeout=30 * 60),
+    Stage("transform_solar_generation", lazy("transform.solar_generation:transform_solar_generation"),
+          deps=("kaggle",), timeout=5 * 60),
+    Stage("transform_youtube", lazy("transform.youtube:transform_youtube"), deps=("youtube",), timeout=15 * 60),
+    Stage("transform_youtube_dedup", lazy("transform.comments:transform_comments"), deps=("youtube",), timeout=15 * 60),
+    # Parquet copies in data/columnar, refreshed after the transforms they read from
+    Stage("columnar_stocks", partial(_update_columnar, ["raw_stocks", "cleaned_stocks"]),
+          deps=("transform_stocks",), timeout=15 * 60),
+    Stage("columnar_pbs", partial(_update_columnar, ["cleaned_pbs"]), deps=("transform_pbs",), timeout=5 * 60),
+    Stage("columnar_weather", partial(_update_columnar, ["raw_solar_radiation", "cleaned_solar_radiation_by_city"]),
+          deps=("transform_weather",), timeout=60 * 60),
+    Stage("columnar_solar_generation", partial(_update_columnar, ["cleaned_solar_generation"]),
+          deps=("transform_solar_generation",), timeout=5 * 60),
+    Stage("columnar_youtube", partial(_update_columnar, ["cleaned_youtube", "cleaned_youtube_deduped"]),
+          deps=("transform_youtube", "transform_youtube_dedup"), timeout=15 * 60),
+]
+
+def startup_seconds() -> float:
+    """Seconds from the first line of this module to now: imports plus argument parsing."""
+    return time.perf_counter() - _STARTED
 
-def main():
+def _stage_list(values: list[str] | None) -> list[str] | None:
+    """Accepts repeated flags and comma-separated names: --only stocks,transform_stocks."""
+    if not values:
+        return None
+    return [name.strip() for value in values for name in value.split(",") if name.strip()]
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Solar energy adoption EL pipeline.")
+    parser.add_argument("--only", action="append", metavar="STAGE",
+                        help="Run only these stages; dependencies outside the selection are assumed done.")
+    parser.add_argument("--skip", action="append", metavar="STAGE", help="Leave these stages out.")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Maximum stages running at once (default: no limit).")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild cleaned outputs and their Parquet copies even if they are up to date.")
+    parser.add_argument("--report", default=None, metavar="PATH",
+                        help="Where to write the JSON run report (default: data/run_reports/<run id>.json).")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="DIR",
+                        help="cProfile every stage into DIR/<stage>.prof (default: next to the report). "
+                             "Stages then run one at a time.")
+    parser.add_argument("--list", action="store_true", help="List the stages and exit.")
+    args = parser.parse_args(argv)
+    args.only, args.skip = _stage_list(args.only), _stage_list(args.skip)
+    if args.max_workers is not None and args.max_workers < 1:
+        parser.error("--max-workers must be at least 1")
+    # Python 3.12+ allows one active cProfile per process, so concurrent stages would go unprofiled
+    if args.profile is not None:
+        if args.max_workers is not None and args.max_workers > 1:
+            parser.error("--profile runs stages one at a time; drop --max-workers or set it to 1")
+        args.max_workers = 1
+    try:
+        select_stages(STAGES, args.only, args.skip)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+def main(argv: list[str] | None = None) -> dict[str, dict]:
+    args = parse_args(argv)
+    if args.list:
+        for stage in STAGES:
+            print(f"{stage.name:<28} deps={','.join(stage.deps) or '-':<10} timeout={stage.timeout}s")
+        print(f"Startup: {startup_seconds() * 1000:.0f} ms")
+        return {}
+
+    startup = startup_seconds()
     print("--- SOLAR ENERGY ADOPTION EL PIPELINE ---")
+    print(f"Startup: {startup * 1000:.0f} ms")
     
     # 1. Initialize
     Config.ensure_directories()
     
-    # 2. Extract (Part 1)
-    print("--- EXTRACTION ---")
-    get_pbs_file_and_setup_for_manual_extraction()
-    extract_stock_data()
-    extract_solar_data_kaggle()
-    extract_youtube_comments()
-    
+    # 2. Extract (Part 1) and Transform (Part 2), independent stages in parallel
+    stages = select_stages(STAGES, args.only, args.skip)
+    if args.force:
+        stages = [
+            Stage(s.name, partial(s.fn, force=True), s.deps, s.timeout)
+            if s.name.startswith(("transform_", "columnar_")) else s
+            for s in stages
+        ]
+    # Stages report API calls, rows and bytes into the run recorder; events stream next to the report
+    run_id = instrumentation.new_run_id()
+    report_path = args.report or os.path.join(REPORTS_DIR, f"{run_id}.json")
+    report_base = os.path.splitext(report_path)[0]
+    recorder = instrumentation.start_run(run_id, events_path=report_base + ".events.jsonl")
+    profile_dir = (args.profile or report_base + "-profiles") if args.profile is not None else None
+    stages = [Stage(s.name, instrumentation.instrumented(s.name, s.fn, profile_dir), s.deps, s.timeout) for s in stages]
+
+    print(f"--- RUNNING {len(stages)} STAGES: {', '.join(s.name for s in stages)} ---")
+    try:
+        results = run_stages(stages, max_workers=args.max_workers)
+    finally:
+        instrumentation.end_run()
+    report = recorder.report(results)
+    report["startup_seconds"] = round(startup, 3)
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
     print("--- PIPELINE COMPLETE ---")
+    for name, result in results.items():
+        metrics = report["stages"][name]
+        print(f"{name:<28} {result['status']:<8} {result['seconds']:>9.1f}s  "
+              f"calls={metrics['api_calls']:<6} units={metrics['quota_units']:<6} "
+              f"rows={metrics['rows_written']:<9,} bytes={metrics['bytes_written']:<11,} {result['error'] or ''}")
+    print(f"Run report: {report_path}")
+    if profile_dir:
+        print(f"Stage profiles: {profile_dir} (python -m pstats {os.path.join(profile_dir, '<stage>.prof')})")
     print(f"Check {Config.BASE_DIR}/data/raw/ for raw data.")
     print(f"Check {Config.BASE_DIR}/data/processed/ for processed data.")
+    print(f"Check {Config.BASE_DIR}/data/cleaned/ for cleaned data.")
+    return results
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    results = main()
+    sys.exit(0 if all(r["status"] == "ok" for r in results.values()) else 1)
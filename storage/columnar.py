@@ -0,0 +1,327 @@
+import os
+import glob
+import json
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from config.settings import Config
+from pipeline import instrumentation
+from transform.manifest import code_version
+
+# CONSTANTS
+COMPRESSION, YEAR_COL, SOURCE_FILE = "zstd", "year", "_source.json"  # "_" files are skipped by dataset discovery
+
+# Layout and column types of every columnar dataset. ``time_col`` drives the
+# derived ``year`` partition and the start/end range filters of read_dataset.
+DATASETS = {
+    "raw_stocks": {
+        "layer": "raw",
+        "partition_cols": ["Ticker", YEAR_COL],
+        "time_col": "Date",
+        "dtypes": {"Close": "float64", "High": "float64", "Low": "float64", "Open": "float64",
+                   "Volume": "float64", "Ticker": "string"},
+    },
+    "raw_solar_radiation": {
+        "layer": "raw",
+        "partition_cols": ["City", YEAR_COL],
+        "time_col": "time",
+        "dtypes": {"ghi_pyr": "float32", "air_temperature": "float32",
+                   "relative_humidity": "float32", "City": "string"},
+    },
+    "cleaned_stocks": {
+        "layer": "cleaned",
+        "partition_cols": ["Ticker", YEAR_COL],
+        "time_col": "Date",
+        "dtypes": {"Close": "float64", "High": "float64", "Low": "float64", "Open": "float64",
+                   "Volume": "int64", "Ticker": "string"},
+    },
+    "cleaned_pbs": {
+        "layer": "cleaned",
+        "partition_cols": [],
+        "time_col": None,
+        "dtypes": {"Fiscal_Year": "int64"},
+    },
+    "cleaned_solar_radiation_by_city": {
+        "layer": "cleaned",
+        "partition_cols": ["City"],
+        "time_col": None,
+        "dtypes": {"City": "string", "Month": "int8", "Hour": "int8", "GHI": "float64",
+                   "Temperature": "float64", "Humidity": "float64"},
+    },
+    "cleaned_solar_generation": {
+        "layer": "cleaned",
+        "partition_cols": [],
+        "time_col": "Date",
+        "dtypes": {"Solar_Gen_GWh": "float64"},
+    },
+    "cleaned_youtube": {
+        "layer": "cleaned",
+        "partition_cols": [YEAR_COL],
+        "time_col": "Published_At",
+        "dtypes": {"Video_Title": "string", "Comment_ID": "string", "Like_Count": "int64",
+                   "Comment": "string", "Comment_Length_raw": "int64", "Comment_Length": "int64"},
+    },
+    "cleaned_youtube_deduped": {
+        "layer": "cleaned",
+        "partition_cols": [YEAR_COL],
+        "time_col": "Published_At",
+        "dtypes": {"Video_Title": "string", "Comment_ID": "string", "Like_Count": "int64",
+                   "Comment_Length_raw": "int64", "Comment_Length": "int64", "Source": "string",
+                   "Comment": "string", "Emoji_Count": "int64", "Duplicate_Count": "int64"},
+    },
+}
+
+def dataset_path(name: str) -> str:
+    spec = DATASETS[name]
+    return os.path.join(Config.COLUMNAR_DATA_DIR, spec["layer"], name)
+
+def _typed(df: pd.DataFrame, spec: dict) -> pd.DataFrame:
+    df = df.astype({c: t for c, t in spec["dtypes"].items() if c in df.columns})
+    time_col = spec["time_col"]
+    if time_col and time_col in df.columns:
+        df[time_col] = pd.to_datetime(df[time_col])
+        if YEAR_COL in spec["partition_cols"]:
+            df[YEAR_COL] = df[time_col].dt.year.astype("int16")
+    return df
+
+def write_dataset(df: pd.DataFrame, name: str, overwrite: bool = False) -> str:
+    """Writes ``df`` as compressed, hive-partitioned Parquet.
+
+    Partitions present in ``df`` replace what is on disk and all others are
+    left alone, so rewriting one ticker or city only touches its files.
+    ``overwrite`` clears the whole dataset first.
+    """
+    spec = DATASETS[name]
+    path = dataset_path(name)
+    if overwrite and os.path.exists(path):
+        shutil.rmtree(path)
+    os.makedirs(path, exist_ok=True)
+
+    table = pa.Table.from_pandas(_typed(df.copy(), spec), preserve_index=False)
+    instrumentation.count("rows_written", table.num_rows)
+    if spec["partition_cols"]:
+        pq.write_to_dataset(
+            table, path,
+            partition_cols=spec["partition_cols"],
+            existing_data_behavior="delete_matching",
+            compression=COMPRESSION,
+        )
+    else:
+        pq.write_table(table, os.path.join(path, "part-0.parquet"), compression=COMPRESSION)
+    return path
+
+def _bound(value, field_type):
+    value = pd.Timestamp(value)
+    tz = getattr(field_type, "tz", None)
+    if tz is not None and value.tzinfo is None:
+        value = value.tz_localize(tz)
+    return value
+
+def _build_filter(spec: dict, schema: pa.Schema, filters: dict | None, start, end):
+    expr = None
+
+    def add(e):
+        nonlocal expr
+        expr = e if expr is None else expr & e
+
+    for col, value in (filters or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            add(ds.field(col).isin(list(value)))
+        else:
+            add(ds.field(col) == value)
+
+    time_col = spec["time_col"]
+    if (start is not None or end is not None) and not time_col:
+        raise ValueError("start/end need a dataset with a time column.")
+    if start is not None:
+        start = _bound(start, schema.field(time_col).type)
+        add(ds.field(time_col) >= start)
+        if YEAR_COL in spec["partition_cols"]:
+            add(ds.field(YEAR_COL) >= start.year)
+    if end is not None:
+        end = _bound(end, schema.field(time_col).type)
+        add(ds.field(time_col) <= end)
+        if YEAR_COL in spec["partition_cols"]:
+            add(ds.field(YEAR_COL) <= end.year)
+    return expr
+
+def read_dataset(
+    name: str,
+    columns: list[str] | None = None,
+    filters: dict | None = None,
+    start=None,
+    end=None,
+) -> pd.DataFrame:
+    """Reads a columnar dataset, pushing projection and predicates down to Parquet.
+
+    ``filters`` maps a column to a value or a list of allowed values (e.g.
+    ``{"Ticker": ["HUBC.KA", "PAEL.KA"]}``); ``start``/``end`` bound the time
+    column inclusively. Filters on partition columns skip whole directories,
+    the rest are checked against row-group statistics before any data is
+    decoded.
+    """
+    spec = DATASETS[name]
+    path = dataset_path(name)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No columnar dataset '{name}' at {path}")
+
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    expr = _build_filter(spec, dataset.schema, filters, start, end)
+    df = dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+    if columns is None:
+        # Partition columns come back last; restore the order they were written in
+        written = [c["name"] for c in (dataset.schema.pandas_metadata or {}).get("columns", [])]
+        df = df[[c for c in written if c in df.columns and c != YEAR_COL]]
+    return df.astype({c: t for c, t in spec["dtypes"].items() if c in df.columns and c in spec["partition_cols"]})
+
+def export_csv(name: str, output_path: str | None = None, **read_kwargs) -> str:
+    """Writes a columnar dataset (or a filtered slice of it) back out as CSV."""
+    if output_path is None:
+        layer_dir = Config.CLEANED_DATA_DIR if DATASETS[name]["layer"] == "cleaned" else Config.PROCESSED_DATA_DIR
+        output_path = os.path.join(layer_dir, f"{name}.csv")
+    read_dataset(name, **read_kwargs).to_csv(output_path, index=False)
+    return output_path
+
+def _raw_stock_files() -> list[str]:
+    return sorted(glob.glob(os.path.join(Config.RAW_DATA_DIR, "yahoo_finance", "stock_*.csv")))
+
+def _raw_radiation_file(city: str) -> str:
+    return os.path.join(Config.RAW_DATA_DIR, "pakistan-solar-radiation-kaggle", f"{city}_complete_data.csv")
+
+def source_files(name: str) -> list[str]:
+    """The existing files a dataset is ingested from."""
+    if name == "raw_stocks":
+        return _raw_stock_files()
+    if name == "raw_solar_radiation":
+        return [f for f in map(_raw_radiation_file, Config.CITIES) if os.path.exists(f)]
+    csv_path = os.path.join(Config.CLEANED_DATA_DIR, f"{name}.csv")
+    return [csv_path] if os.path.exists(csv_path) else []
+
+def _source_key(paths: list[str]) -> dict:
+    """Size and mtime of each source, keyed by absolute path, plus this module's code version."""
+    files = {}
+    for path in paths:
+        st = os.stat(path)
+        files[os.path.abspath(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return {"code": code_version(__file__), "files": files}
+
+def _recorded_source(name: str) -> dict:
+    try:
+        with open(os.path.join(dataset_path(name), SOURCE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def _record_source(name: str, source: dict) -> None:
+    path = os.path.join(dataset_path(name), SOURCE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(source, f, indent=2)
+    os.replace(tmp_path, path)
+
+def is_current(name: str) -> bool:
+    """True when the dataset was ingested from exactly the source files there are now."""
+    files = source_files(name)
+    return bool(files) and _recorded_source(name) == _source_key(files)
+
+def ingest_raw_stocks() -> str | None:
+    """Converts the raw yfinance CSVs (two-row headers) into the raw_stocks dataset."""
+    stock_files = _raw_stock_files()
+    frames = []
+    for file in stock_files:
+        ticker = os.path.basename(file).split('_')[1]
+        df = pd.read_csv(file, header=[0, 1], index_col=0)
+        df.columns = df.columns.get_level_values(0)
+        df.index.name = 'Date'
+        df = df.reset_index()
+        df['Ticker'] = ticker
+        frames.append(df)
+
+    if not frames:
+        print("No raw stock files to ingest.")
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    df['Date'] = pd.to_datetime(df['Date'], utc=True).dt.tz_convert(None)
+    df = df.drop_duplicates(subset=['Ticker', 'Date'], keep='last')
+    return write_dataset(df, "raw_stocks")
+
+def ingest_raw_solar_radiation(cities: list[str] = Config.CITIES, chunksize: int = 500_000) -> str | None:
+    """Converts each ``{city}_complete_data.csv`` into the raw_solar_radiation dataset.
+
+    Files are read in chunks and each chunk is appended as its own Parquet
+    fragment, so a city never has to fit in memory as text.
+    """
+    spec = DATASETS["raw_solar_radiation"]
+    path = dataset_path("raw_solar_radiation")
+    written = False
+    for city in cities:
+        file_path = _raw_radiation_file(city)
+        if not os.path.exists(file_path):
+            continue
+
+        city_dir = os.path.join(path, f"City={city.capitalize()}")
+        if os.path.exists(city_dir):
+            shutil.rmtree(city_dir)
+        for i, chunk in enumerate(pd.read_csv(file_path, chunksize=chunksize)):
+            chunk['City'] = city.capitalize()
+            table = pa.Table.from_pandas(_typed(chunk, spec), preserve_index=False)
+            instrumentation.count("rows_written", table.num_rows)
+            pq.write_to_dataset(
+                table, path,
+                partition_cols=spec["partition_cols"],
+                basename_template=f"chunk-{i}-{{i}}.parquet",
+                compression=COMPRESSION,
+            )
+        written = True
+        print(f"Ingested {file_path}")
+    return path if written else None
+
+def ingest_cleaned(names: list[str] | None = None) -> list[str]:
+    """Loads every ``data/cleaned/*.csv`` that has a dataset spec (or those in ``names``) into Parquet."""
+    paths = []
+    for name, spec in DATASETS.items():
+        csv_path = os.path.join(Config.CLEANED_DATA_DIR, f"{name}.csv")
+        if spec["layer"] != "cleaned" or (names and name not in names) or not os.path.exists(csv_path):
+            continue
+        paths.append(write_dataset(pd.read_csv(csv_path), name, overwrite=True))
+    return paths
+
+def update_columnar(names: list[str] | None = None, force: bool = False) -> list[str]:
+    """Re-ingests the datasets (all, or ``names``) whose source files changed since their last ingest.
+
+    Each dataset keeps the size and mtime of its sources in ``_source.json``.
+    Raw radiation is only re-read for the cities whose file changed, since
+    those files run to gigabytes. Returns the dataset paths written.
+    """
+    written = []
+    for name in names or DATASETS:
+        files = source_files(name)
+        if not files:
+            print(f"No source files for columnar dataset {name}.")
+            continue
+        source = _source_key(files)
+        recorded = _recorded_source(name)
+        if not force and recorded == source:
+            print(f"Columnar {name} is up to date; skipping.")
+            instrumentation.log_event("up_to_date", path=dataset_path(name))
+            continue
+
+        if name == "raw_stocks":
+            ingest_raw_stocks()
+        elif name == "raw_solar_radiation":
+            stale = force or recorded.get("code") != source["code"]
+            before = recorded.get("files", {})
+            changed = {f for f, key in source["files"].items() if stale or before.get(f) != key}
+            ingest_raw_solar_radiation([c for c in Config.CITIES if os.path.abspath(_raw_radiation_file(c)) in changed])
+        else:
+            ingest_cleaned([name])
+        path = dataset_path(name)
+        _record_source(name, source)
+        instrumentation.log_event("columnar_written", dataset=name, path=path)
+        written.append(path)
+        print(f"Columnar {name} written to {path}")
+    return written
+
@@ -0,0 +1,210 @@
+import os
+import json
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from transform.stocks import PRICE_COLS
+
+# CONSTANTS
+PANEL_DIR, PANEL_VERSION = "stock_panel", 2
+VALUES_FILE, VOLUME_FILE, DATES_FILE, META_FILE = "values.npy", "volume.npy", "dates.npy", "meta.json"
+VOLUME = "Volume"
+PRICE_FIELDS = [c for c in PRICE_COLS if c != VOLUME]
+
+def stocks_csv(cleaned_dir: str | None = None) -> str:
+    return os.path.join(cleaned_dir or Config.CLEANED_DATA_DIR, "cleaned_stocks.csv")
+
+def load_stock_long(path: str | None = None) -> pd.DataFrame:
+    """cleaned_stocks.csv as a compact long table.
+
+    ``Ticker`` is categorical, prices are float32 and ``Volume`` is uint32
+    (uint64 if any volume does not fit, float64 if any is missing), about
+    40% of the default string/float64 frame.
+    """
+    path = path or stocks_csv()
+    df = pd.read_csv(
+        path,
+        dtype={"Ticker": "category", **{c: "float32" for c in PRICE_FIELDS}, VOLUME: "float64"},
+    )
+    df["Date"] = pd.to_datetime(df["Date"], format="ISO8601")
+    volume = df[VOLUME].to_numpy()
+    if not np.isnan(volume).any():
+        df[VOLUME] = volume.astype(np.uint32 if volume.max(initial=0) < 2**32 else np.uint64)
+    return df[["Date", "Ticker"] + PRICE_COLS]
+
+def _source_key(path: str) -> dict:
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _filled_memmap(path: str, shape: tuple, dtype) -> np.memmap:
+    values = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+    values[:] = np.nan
+    return values
+
+def build_stock_panel(long_df: pd.DataFrame, panel_dir: str, source: dict | None = None) -> None:
+    """Writes the panel arrays, their date index and metadata to ``panel_dir``.
+
+    Prices go into a (date x ticker x price field) float32 array. Volume
+    goes into its own (date x ticker) float64 array, because float32 is
+    exact only up to 2**24 and daily volumes exceed that. Both arrays are
+    filled through memmaps straight from integer codes, with no pandas
+    pivot; missing (date, ticker) cells are NaN. Files are written to a
+    sibling directory and swapped in, so readers never see a partial panel.
+    """
+    dates, date_idx = np.unique(long_df["Date"].to_numpy(dtype="datetime64[ns]"), return_inverse=True)
+    tickers = long_df["Ticker"].astype("category")
+    ticker_idx = tickers.cat.codes.to_numpy()
+    n_dates, n_tickers = len(dates), len(tickers.cat.categories)
+
+    tmp_dir = panel_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    values = _filled_memmap(os.path.join(tmp_dir, VALUES_FILE), (n_dates, n_tickers, len(PRICE_FIELDS)), np.float32)
+    for k, col in enumerate(PRICE_FIELDS):
+        values[date_idx, ticker_idx, k] = long_df[col].to_numpy(dtype=np.float32)
+    values.flush()
+    volume = _filled_memmap(os.path.join(tmp_dir, VOLUME_FILE), (n_dates, n_tickers), np.float64)
+    volume[date_idx, ticker_idx] = long_df[VOLUME].to_numpy(dtype=np.float64)
+    volume.flush()
+    del values, volume
+    np.save(os.path.join(tmp_dir, DATES_FILE), dates)
+    with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "version": PANEL_VERSION,
+            "tickers": [str(t) for t in tickers.cat.categories],
+            "fields": PRICE_FIELDS,
+            "source": source or {},
+        }, f, indent=2)
+
+    shutil.rmtree(panel_dir, ignore_errors=True)
+    os.replace(tmp_dir, panel_dir)
+
+class StockPanel:
+    """Read-only, memory-mapped stock panel.
+
+    ``values[date, ticker, price field]`` is float32 and ``volume[date,
+    ticker]`` float64, so volumes stay exact. Date ranges, single tickers
+    and single fields are plain slices of the memmaps, so they are views:
+    nothing is read until used and the OS page cache holds one copy however
+    many processes open the panel. Pickling a panel (e.g. into a
+    ProcessPoolExecutor task) sends only its directory; the worker maps the
+    same files.
+    """
+
+    def __init__(self, panel_dir: str):
+        self.panel_dir = panel_dir
+        with open(os.path.join(panel_dir, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.tickers: list[str] = self.meta["tickers"]
+        self.price_fields: list[str] = self.meta["fields"]
+        self.fields: list[str] = self.price_fields + [VOLUME]
+        self.dates = pd.DatetimeIndex(np.load(os.path.join(panel_dir, DATES_FILE)), name="Date")
+        self.values: np.ndarray = np.load(os.path.join(panel_dir, VALUES_FILE), mmap_mode="r")
+        self.volume: np.ndarray = np.load(os.path.join(panel_dir, VOLUME_FILE), mmap_mode="r")
+        self._ticker_pos = {t: i for i, t in enumerate(self.tickers)}
+        self._field_pos = {f: i for i, f in enumerate(self.price_fields)}
+
+    def __reduce__(self):
+        return (StockPanel, (self.panel_dir,))
+
+    def __repr__(self):
+        return f"StockPanel({len(self.dates)} dates x {len(self.tickers)} tickers x {len(self.fields)} fields)"
+
+    def date_slice(self, start=None, end=None) -> slice:
+        """Positions of dates in ``[start, end]`` (inclusive), found by binary search."""
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side="left")
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        return slice(lo, hi)
+
+    def _positions(self, names, lookup: dict, kind: str):
+        if names is None:
+            return slice(None)
+        if isinstance(names, str):
+            if names not in lookup:
+                raise KeyError(f"Unknown {kind}: {names}")
+            return lookup[names]
+        missing = [n for n in names if n not in lookup]
+        if missing:
+            raise KeyError(f"Unknown {kind}(s): {', '.join(missing)}")
+        pos = [lookup[n] for n in names]
+        # Consecutive positions stay a slice, and therefore a view
+        if pos and pos == list(range(pos[0], pos[0] + len(pos))):
+            return slice(pos[0], pos[0] + len(pos))
+        return pos
+
+    def select(self, start=None, end=None, tickers=None, fields=None) -> np.ndarray:
+        """Sub-array for a date range and ticker/field names (a single name drops that axis).
+
+        A view of a memmap unless ``tickers`` or ``fields`` are
+        non-consecutive lists, which NumPy has to gather into a copy. Field
+        lists that mix prices with ``Volume`` come back as a float64 copy.
+        """
+        rows = self.date_slice(start, end)
+        cols = self._positions(tickers, self._ticker_pos, "ticker")
+        if fields == VOLUME:
+            return self.volume[rows][:, cols]
+        if fields is None or (not isinstance(fields, str) and VOLUME in fields):
+            names = self.fields if fields is None else list(fields)
+            return np.stack([self.select(start, end, tickers, name) for name in names], axis=-1)
+        layer = self._positions(fields, self._field_pos, "field")
+        # One axis at a time: mixing a list with a slice in one index would reorder axes
+        return self.values[rows][:, cols][..., layer]
+
+    def field(self, field: str = "Close", start=None, end=None) -> np.ndarray:
+        """(dates x tickers) view of one field."""
+        return self.select(start, end, fields=field)
+
+    def frame(self, field: str = "Close", start=None, end=None, tickers=None) -> pd.DataFrame:
+        """Date x Ticker DataFrame of one field, the notebook's ``pivot``, built from the memmap."""
+        rows = self.date_slice(start, end)
+        names = self.tickers if tickers is None else [tickers] if isinstance(tickers, str) else list(tickers)
+        data = self.select(start, end, tickers=names, fields=field)
+        return pd.DataFrame(data, index=self.dates[rows], columns=pd.Index(names, name="Ticker"), copy=False)
+
+    def long(self, start=None, end=None) -> pd.DataFrame:
+        """Back to the compact long layout (categorical Ticker, float32 prices, float64 Volume), present cells only."""
+        rows = self.date_slice(start, end)
+        prices = np.asarray(self.values[rows])
+        volume = np.asarray(self.volume[rows])
+        n_dates, n_tickers, _ = prices.shape
+        prices = prices.reshape(n_dates * n_tickers, len(self.price_fields))
+        volume = volume.reshape(n_dates * n_tickers)
+        present = ~(np.isnan(prices).all(axis=1) & np.isnan(volume))
+        date_pos, ticker_pos = np.divmod(np.flatnonzero(present), n_tickers)
+        df = pd.DataFrame(prices[present], columns=self.price_fields)
+        df[VOLUME] = volume[present]
+        df.insert(0, "Ticker", pd.Categorical.from_codes(ticker_pos, categories=self.tickers))
+        df.insert(0, "Date", self.dates[rows][date_pos])
+        return df
+
+_default_panel: StockPanel | None = None
+_default_lock = threading.Lock()
+
+def open_stock_panel(
+    csv_path: str | None = None, panel_dir: str | None = None, rebuild: bool = False
+) -> StockPanel:
+    """The memory-mapped panel of ``cleaned_stocks.csv``, rebuilt when the CSV's size or mtime changed."""
+    csv_path = csv_path or stocks_csv()
+    panel_dir = panel_dir or os.path.join(os.path.dirname(csv_path), PANEL_DIR)
+    source = _source_key(csv_path)
+    meta_path = os.path.join(panel_dir, META_FILE)
+    if not rebuild and os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") == PANEL_VERSION and meta.get("source") == source:
+            return StockPanel(panel_dir)
+
+    df = load_stock_long(csv_path)
+    build_stock_panel(df, panel_dir, source)
+    print(f"Stock panel built: {len(df):,} rows -> {panel_dir}")
+    return StockPanel(panel_dir)
+
+def get_stock_panel() -> StockPanel:
+    """Process-wide panel at ``data/cleaned/stock_panel``, built or refreshed on first use."""
+    global _default_panel
+    with _default_lock:
+        if _default_panel is None:
+            _default_panel = open_stock_panel()
+        return _default_panel
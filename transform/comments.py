@@ -0,0 +1,205 @@
+import os
+import numpy as np
+import pandas as pd
+from config.settings import Config
+from pipeline import instrumentation
+from extractload import comment_store
+from extractload.comment_store import iter_flattened_comments
+from transform import validation, youtube
+from transform.youtube import MIN_COMMENT_LENGTH, unescape_comments
+from transform.manifest import code_version, get_manifest
+
+# CONSTANTS
+SHINGLE_SIZE, NUM_PERM, BANDS, SIMILARITY = 5, 32, 8, 0.6
+SEED = 1729
+
+# Raw comment stores in priority order: a comment found in both keeps its channel row
+SOURCES = {"channel": "matched_comments", "global": "global_pakistan_solar_comments"}
+
+TAG_RE = r"<[^>]+>"
+EMOJI_RE = (
+    "[\U0001F000-\U0001FAFF\U00002600-\U000027BF\U00002B00-\U00002BFF"
+    "\U0001F1E6-\U0001F1FF\U0000FE0F\U0000200D\U000020E3]"
+)
+
+def source_path(name: str) -> str:
+    """JSONL store when present, else the legacy JSON dump."""
+    base = os.path.join(Config.RAW_DATA_DIR, "yt_comments", name)
+    return base + ".jsonl" if os.path.exists(base + ".jsonl") else base + ".json"
+
+def load_comment_sources(paths: dict[str, str] | None = None) -> pd.DataFrame:
+    """Flattened comments of every raw source with a ``Source`` column; exact Comment_ID repeats dropped."""
+    paths = paths or {source: source_path(name) for source, name in SOURCES.items()}
+    frames = []
+    for source, path in paths.items():
+        if os.path.exists(path):
+            df = pd.DataFrame(iter_flattened_comments(path))
+            df['Source'] = source
+            frames.append(df)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True).drop_duplicates(subset=['Comment_ID'], ignore_index=True)
+
+def normalize_comments(comments: pd.Series) -> pd.DataFrame:
+    """Batch text normalization; every step is a vectorized ``str`` operation.
+
+    Returns ``Comment`` (unescaped, HTML tags such as ``<br>`` removed,
+    whitespace collapsed), ``Comment_Key`` (casefolded, emoji and punctuation
+    removed: the text near-duplicates are matched on) and ``Emoji_Count``.
+    """
+    text = unescape_comments(comments.fillna(""))
+    text = text.str.replace(TAG_RE, " ", regex=True).str.replace(r"\s+", " ", regex=True).str.strip()
+    key = (
+        text.str.casefold()
+        .str.replace(EMOJI_RE, "", regex=True)
+        .str.replace(r"[^\w\s]", "", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+    return pd.DataFrame({
+        'Comment': text,
+        'Comment_Key': key,
+        'Emoji_Count': text.str.count(EMOJI_RE),
+    }, index=comments.index)
+
+def _shingle_hashes(keys: list[str], k: int = SHINGLE_SIZE) -> tuple[np.ndarray, np.ndarray]:
+    """64-bit hashes of every character k-gram, and the document each belongs to.
+
+    All documents are concatenated into one code-point array and the rolling
+    polynomial hash is built with ``k`` shifted array operations; k-grams that
+    straddle two documents are masked out. Every key must have ``len >= k``.
+    """
+    lengths = np.fromiter((len(s) for s in keys), dtype=np.int64, count=len(keys))
+    codes = np.frombuffer("".join(keys).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    n_grams = len(codes) - k + 1
+
+    h = np.zeros(n_grams, dtype=np.uint64)
+    prime = np.uint64(1_099_511_628_211)
+    with np.errstate(over="ignore"):
+        for j in range(k):
+            h = h * prime + codes[j:j + n_grams]
+
+    doc = np.repeat(np.arange(len(keys)), lengths)[:n_grams]
+    ends = np.cumsum(lengths)
+    inside = np.arange(n_grams) + k <= ends[doc]
+    return h[inside], doc[inside]
+
+def minhash_signatures(keys: list[str], num_perm: int = NUM_PERM, seed: int = SEED) -> np.ndarray:
+    """(len(keys), num_perm) MinHash signatures over character shingles.
+
+    Each permutation is a multiply-shift hash of the shingle hashes followed
+    by a per-document ``np.minimum.reduceat``; shingles are contiguous per
+    document, so no sorting is needed.
+    """
+    hashes, doc = _shingle_hashes(keys)
+    starts = np.flatnonzero(np.r_[True, doc[1:] != doc[:-1]])
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    sig = np.empty((len(keys), num_perm), dtype=np.uint32)
+    permuted = np.empty_like(hashes)
+    with np.errstate(over="ignore"):
+        for i in range(num_perm):
+            np.multiply(hashes, a[i], out=permuted)
+            np.add(permuted, b[i], out=permuted)
+            np.right_shift(permuted, np.uint64(32), out=permuted)
+            sig[doc[starts], i] = np.minimum.reduceat(permuted, starts)
+    return sig
+
+def _components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Connected-component label (smallest member) of every node, by min-label propagation."""
+    labels = np.arange(n)
+    while len(left):
+        low = np.minimum(labels[left], labels[right])
+        changed = (labels[left] != low) | (labels[right] != low)
+        if not changed.any():
+            break
+        np.minimum.at(labels, left, low)
+        np.minimum.at(labels, right, low)
+        labels = labels[labels]  # pointer jumping
+    return labels
+
+def near_duplicate_clusters(
+    keys: list[str], bands: int = BANDS, num_perm: int = NUM_PERM, threshold: float = SIMILARITY
+) -> np.ndarray:
+    """Cluster label per key; keys whose estimated shingle Jaccard >= ``threshold`` share one.
+
+    LSH banding: signatures are cut into ``bands`` bands and keys colliding
+    in any band become candidates, each linked to the first key of its
+    bucket. Candidates are confirmed on the fraction of agreeing MinHash
+    values, so the work is linear in the number of keys, never pairwise.
+    """
+    if not keys:
+        return np.empty(0, dtype=np.int64)
+    sig = minhash_signatures(keys, num_perm)
+    rows = num_perm // bands
+    mix = np.random.default_rng(SEED).integers(1, 2**63, size=rows, dtype=np.uint64) | np.uint64(1)
+    left, right = [], []
+    for band in range(bands):
+        # One 64-bit bucket id per key and band
+        with np.errstate(over="ignore"):
+            bucket = (sig[:, band * rows:(band + 1) * rows].astype(np.uint64) * mix).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(bucket, kind="stable")
+        sorted_bucket = bucket[order]
+        first = np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]]
+        leader = order[first][np.cumsum(first) - 1]
+        left.append(leader[~first])
+        right.append(order[~first])
+
+    pair_ids = np.unique(np.concatenate(left) * len(keys) + np.concatenate(right))
+    left, right = np.divmod(pair_ids, len(keys))
+    agree = (sig[left] == sig[right]).mean(axis=1)
+    confirmed = agree >= threshold
+    return _components(len(keys), left[confirmed], right[confirmed])
+
+def dedupe_comments(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """Normalizes, filters short comments and collapses exact and near-duplicate texts.
+
+    Each cluster keeps its earliest comment, with ``Duplicate_Count`` saying
+    how many raw comments (itself included) it stands for.
+    """
+    df = df_raw.drop(columns=['Comment']).join(normalize_comments(df_raw['Comment']))
+    df['Published_At'] = pd.to_datetime(df['Published_At'])
+    df['Comment_Length'] = df['Comment'].str.len()
+    df = df[df['Comment_Length'] > MIN_COMMENT_LENGTH].reset_index(drop=True)
+
+    # Exact duplicates first; short keys (mostly emoji) are matched on the full text instead
+    long_key = df['Comment_Key'].str.len() >= SHINGLE_SIZE
+    match_text = df['Comment_Key'].where(long_key, "\x00" + df['Comment'])
+    exact, uniques = pd.factorize(match_text)
+
+    cluster = np.arange(len(uniques))
+    is_long = ~uniques.str.startswith("\x00")
+    long_ids = np.flatnonzero(is_long)
+    if len(long_ids):
+        cluster[long_ids] = long_ids[near_duplicate_clusters(list(uniques[long_ids]))]
+    df['Cluster'] = cluster[exact]
+
+    df = df.sort_values(['Published_At', 'Comment_ID'], kind='stable')
+    df['Duplicate_Count'] = df.groupby('Cluster')['Comment_ID'].transform('size')
+    df = df.drop_duplicates(subset=['Cluster'], keep='first').sort_index()
+    return df.drop(columns=['Cluster', 'Comment_Key']).reset_index(drop=True)
+
+def transform_comments(output_path: str | None = None, force: bool = False) -> pd.DataFrame | None:
+    """Merges channel and global comments into one near-deduplicated table."""
+    output_path = output_path or os.path.join(Config.CLEANED_DATA_DIR, "cleaned_youtube_deduped.csv")
+    manifest = get_manifest()
+    code = code_version(__file__, youtube.__file__, comment_store.__file__, validation.__file__)
+    inputs = manifest.fingerprint([source_path(name) for name in SOURCES.values()])
+    if not force and manifest.is_fresh(output_path, inputs, code):
+        print(f"{os.path.basename(output_path)} is up to date; skipping.")
+        instrumentation.log_event("up_to_date", path=output_path)
+        return None
+
+    df_raw = load_comment_sources()
+    if df_raw.empty:
+        print("No raw YouTube comments found.")
+        return df_raw
+
+    df = validation.quarantine_invalid("youtube_deduped", dedupe_comments(df_raw))
+    df.to_csv(output_path, index=False)
+    instrumentation.record_output(output_path, len(df))
+    manifest.record(output_path, inputs, code)
+    print(f"YouTube comments merged: {len(df_raw):,} raw -> {len(df):,} distinct -> {output_path}")
+    return df
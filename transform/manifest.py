@@ -0,0 +1,128 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime, timezone
+from config.settings import Config
+
+# CONSTANTS
+MANIFEST_FILE, HASH_CHUNK = "build_manifest.json", 1 << 20
+
+def relative_path(path: str) -> str:
+    return os.path.relpath(os.path.abspath(path), Config.BASE_DIR)
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def code_version(*source_files: str) -> str:
+    """Hash of the transform's own source files; editing the code invalidates its outputs."""
+    digest = hashlib.sha256()
+    for path in source_files:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+class BuildManifest:
+    """Records, per cleaned artifact, the inputs, code version and output it was built from.
+
+    Entries are keyed by the output path relative to the project root::
+
+        {"data/cleaned/cleaned_pbs.csv": {
+            "code": "...", "inputs": {"data/processed/PBS/...csv": {"sha256", "size", "mtime_ns"}},
+            "output": {"sha256", "size", "mtime_ns"}, "built_at": "..."}}
+
+    File hashes are reused while a file's size and mtime are unchanged, so
+    checking a multi-GB input does not re-read it on every run. Every
+    ``record`` re-reads the file before writing, so transforms running on
+    parallel pipeline threads do not drop each other's entries.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _known_fingerprints(self, manifest: dict) -> dict:
+        known = {}
+        for entry in manifest.values():
+            known.update(entry.get("inputs", {}))
+            if "output" in entry:
+                known[entry["output_path"]] = entry["output"]
+        return known
+
+    def fingerprint(self, paths: list[str]) -> dict[str, dict]:
+        """``{relative_path: {"sha256", "size", "mtime_ns"}}`` for the files that exist."""
+        with self._lock:
+            known = self._known_fingerprints(self._load())
+        out = {}
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            rel, st = relative_path(path), os.stat(path)
+            prev = known.get(rel)
+            if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+                out[rel] = prev
+            else:
+                out[rel] = {"sha256": _sha256(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        return out
+
+    def entry(self, output_path: str) -> dict:
+        with self._lock:
+            return self._load().get(relative_path(output_path), {})
+
+    def output_intact(self, output_path: str, entry: dict | None = None) -> bool:
+        """True when ``output_path`` is still exactly the file the manifest recorded."""
+        entry = self.entry(output_path) if entry is None else entry
+        if "output" not in entry or not os.path.exists(output_path):
+            return False
+        current = self.fingerprint([output_path]).get(relative_path(output_path))
+        return current is not None and current["sha256"] == entry["output"]["sha256"]
+
+    def is_fresh(self, output_path: str, inputs: dict[str, dict], code: str) -> bool:
+        entry = self.entry(output_path)
+        if entry.get("code") != code:
+            return False
+        recorded = {k: v["sha256"] for k, v in entry.get("inputs", {}).items()}
+        if recorded != {k: v["sha256"] for k, v in inputs.items()}:
+            return False
+        return self.output_intact(output_path, entry)
+
+    def record(self, output_path: str, inputs: dict[str, dict], code: str, **extra) -> None:
+        rel = relative_path(output_path)
+        st = os.stat(output_path)
+        output = {"sha256": _sha256(output_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        with self._lock:
+            manifest = self._load()
+            manifest[rel] = {
+                "code": code,
+                "inputs": inputs,
+                "output_path": rel,
+                "output": output,
+                "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                **extra,
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+_default_manifest: BuildManifest | None = None
+_default_lock = threading.Lock()
+
+def get_manifest() -> BuildManifest:
+    """Process-wide manifest at ``data/cleaned/build_manifest.json``."""
+    global _default_manifest
+    with _default_lock:
+        if _default_manifest is None:
+            _default_manifest = BuildManifest(os.path.join(Config.CLEANED_DATA_DIR, MANIFEST_FILE))
+        return _default_manifest
@@ -0,0 +1,130 @@
+import os
+import pandas as pd
+from config.settings import Config
+from pipeline import instrumentation
+from transform.manifest import code_version, get_manifest
+from transform import validation
+
+PBS_TABLES = {
+    "cap": "table_4_2_installed_capacity_by_source_2006-2021.csv",
+    "gen": "table_4_6_electricity_generation_by_source.csv",
+    "gva": "table_4_8_gva_and_subsidy.csv",
+    "prov": "table_4_7_electricity_generation_by_province_and_source.csv",
+}
+
+GEN_COLS = ['Nuclear', 'Hydel', 'Thermal', 'Bagasse', 'Solar', 'Wind', 'Grand Total']
+PROVINCES = ['Punjab', 'Sindh', 'KP', 'Balochistan']
+
+def pbs_table_paths(pbs_dir: str | None = None) -> dict[str, str]:
+    pbs_dir = pbs_dir or os.path.join(Config.PROCESSED_DATA_DIR, "PBS")
+    return {key: os.path.join(pbs_dir, name) for key, name in PBS_TABLES.items()}
+
+def load_raw_pbs(pbs_dir: str | None = None) -> dict[str, pd.DataFrame]:
+    """Reads the hand-extracted PBS tables, keyed "cap", "gen", "gva" and "prov"."""
+    return {key: pd.read_csv(path) for key, path in pbs_table_paths(pbs_dir).items()}
+
+def fiscal_year(year: pd.Series, require_dash: bool = False) -> pd.Series:
+    """Maps "2006-07"-style years to their closing fiscal year (2007), vectorized.
+
+    Missing years (and, with ``require_dash``, years without a dash) become
+    NaN, in which case the result is float64 as the notebook's row-wise
+    version produced; otherwise it stays int64.
+    """
+    text = year.astype(str)
+    valid = year.notna()
+    if require_dash:
+        valid &= text.str.contains('-', regex=False)
+
+    start = text.str.split('-', n=1).str[0]
+    if valid.all():
+        return start.astype('int64') + 1
+    return start.where(valid).astype('float64') + 1
+
+def _strip_commas(col: pd.Series) -> pd.Series:
+    # Columns pandas already parsed as numbers skip the str round-trip
+    if pd.api.types.is_numeric_dtype(col):
+        return col.astype(float)
+    return col.astype(str).str.replace(',', '', regex=False).astype(float)
+
+def clean_pbs(
+    df_raw_gen: pd.DataFrame,
+    df_raw_cap: pd.DataFrame,
+    df_raw_gva: pd.DataFrame,
+    df_raw_prov: pd.DataFrame,
+) -> pd.DataFrame:
+    """Joins generation, capacity, GVA/subsidy and provincial tables on Fiscal_Year."""
+    df_gen = df_raw_gen.copy()
+    df_gen['Fiscal_Year'] = fiscal_year(df_gen['Year'])
+    for col in GEN_COLS:
+        if col in df_gen.columns:
+            df_gen[col] = _strip_commas(df_gen[col])
+    df_gen = df_gen[['Fiscal_Year'] + GEN_COLS].rename(columns={
+        'Solar': 'Solar_Gen_GWh',   'Grand Total': 'Total_Gen_GWh',
+        'Nuclear': 'Nuclear_Gen_GWh', 'Hydel': 'Hydel_Gen_GWh',
+        'Thermal': 'Thermal_Gen_GWh', 'Bagasse': 'Bagasse_Gen_GWh', 'Wind': 'Wind_Gen_GWh'
+    })
+
+    df_cap = df_raw_cap.copy()
+    df_cap['Fiscal_Year'] = df_cap['Year'].astype(int)
+    df_cap = df_cap[['Fiscal_Year', 'Solar', 'Total']].rename(
+        columns={'Solar': 'Solar_Cap_MW', 'Total': 'Total_Cap_MW'})
+
+    df_gva = df_raw_gva.copy()
+    df_gva['Fiscal_Year'] = fiscal_year(df_gva['Year'])
+    for col in ['GVA (at current price)', 'Subsidy']:
+        if col in df_gva.columns:
+            df_gva[col] = _strip_commas(df_gva[col])
+    df_gva = df_gva[['Fiscal_Year', 'GVA (at current price)', 'Subsidy']].rename(columns={
+        'GVA (at current price)': 'GVA_Investment_Millions',
+        'Subsidy':                'Subsidy_Millions'
+    })
+
+    df_prov = df_raw_prov.copy()
+    df_prov['Fiscal_Year'] = fiscal_year(df_prov['Year'], require_dash=True)
+    df_prov_overall = (
+        df_prov[df_prov['Source\\State'] == 'Overall']
+        [['Fiscal_Year'] + PROVINCES]
+        .rename(columns={c: f"{c}_Total_Gen_GWh" for c in PROVINCES})
+    )
+    df_prov_solar = (
+        df_prov[df_prov['Source\\State'] == 'Solar']
+        [['Fiscal_Year', 'Punjab', 'Sindh']]
+        .rename(columns={'Punjab': 'Punjab_Solar_Gen_GWh', 'Sindh': 'Sindh_Solar_Gen_GWh'})
+    )
+
+    df_pbs = df_gen.merge(df_cap, on='Fiscal_Year', how='left')
+    df_pbs = df_pbs.merge(df_gva, on='Fiscal_Year', how='left')
+    df_pbs = df_pbs.merge(df_prov_overall, on='Fiscal_Year', how='left')
+    df_pbs = df_pbs.merge(df_prov_solar, on='Fiscal_Year', how='left')
+
+    df_pbs['Solar_Gen_Share_Pct']   = (df_pbs['Solar_Gen_GWh'] / df_pbs['Total_Gen_GWh']) * 100
+    df_pbs['Total_Utilization_Pct'] = (df_pbs['Total_Gen_GWh'] * 1000) / (df_pbs['Total_Cap_MW'] * 8760) * 100
+    df_pbs['Solar_Utilization_Pct'] = 0.0
+    mask = df_pbs['Solar_Cap_MW'] > 0
+    df_pbs.loc[mask, 'Solar_Utilization_Pct'] = (
+        df_pbs.loc[mask, 'Solar_Gen_GWh'] * 1000) / (df_pbs.loc[mask, 'Solar_Cap_MW'] * 8760) * 100
+    return df_pbs
+
+def transform_pbs(output_path: str | None = None, force: bool = False) -> pd.DataFrame | None:
+    output_path = output_path or os.path.join(Config.CLEANED_DATA_DIR, "cleaned_pbs.csv")
+    manifest, code = get_manifest(), code_version(__file__, validation.__file__)
+    inputs = manifest.fingerprint(list(pbs_table_paths().values()))
+    if not force and manifest.is_fresh(output_path, inputs, code):
+        print(f"{os.path.basename(output_path)} is up to date; skipping.")
+        instrumentation.log_event("up_to_date", path=output_path)
+        return None
+    try:
+        raw = load_raw_pbs()
+    except FileNotFoundError as e:
+        print(f"PBS tables not available: {e}")
+        return pd.DataFrame()
+    if raw["gen"].empty:
+        print("PBS tables are still empty templates; skipping.")
+        return raw["gen"]
+
+    df = validation.quarantine_invalid("pbs", clean_pbs(raw["gen"], raw["cap"], raw["gva"], raw["prov"]))
+    df.to_csv(output_path, index=False)
+    instrumentation.record_output(output_path, len(df))
+    manifest.record(output_path, inputs, code)
+    print(f"PBS cleaned and merged: {len(df):,} rows -> {output_path}")
+    return df
@@ -0,0 +1,41 @@
+import os
+import pandas as pd
+from config.settings import Config
+from pipeline import instrumentation
+from transform.manifest import code_version, get_manifest
+from transform import validation
+
+def solar_generation_file(raw_dir: str | None = None) -> str:
+    raw_dir = raw_dir or Config.RAW_DATA_DIR
+    return os.path.join(raw_dir, "pakistan-electricity-generation-by-solar-kaggle", "data_series.csv")
+
+def load_raw_solar_generation(raw_dir: str | None = None) -> pd.DataFrame:
+    gen_path = solar_generation_file(raw_dir)
+    return pd.read_csv(gen_path) if os.path.exists(gen_path) else pd.DataFrame()
+
+def clean_solar_generation(df_raw_solar_gen: pd.DataFrame) -> pd.DataFrame:
+    """Parses observation dates, coerces values to numbers and sorts by date."""
+    df = df_raw_solar_gen.copy()
+    df['Date'] = pd.to_datetime(df['Observation Date'])
+    df['Solar_Gen_GWh'] = pd.to_numeric(df['Observation Value'], errors='coerce')
+    return df[['Date', 'Solar_Gen_GWh']].dropna().sort_values('Date').reset_index(drop=True)
+
+def transform_solar_generation(output_path: str | None = None, force: bool = False) -> pd.DataFrame | None:
+    output_path = output_path or os.path.join(Config.CLEANED_DATA_DIR, "cleaned_solar_generation.csv")
+    manifest, code = get_manifest(), code_version(__file__, validation.__file__)
+    inputs = manifest.fingerprint([solar_generation_file()])
+    if not force and manifest.is_fresh(output_path, inputs, code):
+        print(f"{os.path.basename(output_path)} is up to date; skipping.")
+        instrumentation.log_event("up_to_date", path=output_path)
+        return None
+    df_raw = load_raw_solar_generation()
+    if df_raw.empty:
+        print("No raw solar generation data found.")
+        return df_raw
+
+    df = validation.quarantine_invalid("solar_generation", clean_solar_generation(df_raw))
+    df.to_csv(output_path, index=False)
+    instrumentation.record_output(output_path, len(df))
+    manifest.record(output_path, inputs, code)
+    print(f"Solar generation cleaned: {len(df):,} rows -> {output_path}")
+    return df
@@ -0,0 +1,179 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from config.settings import Config
+from pipeline import instrumentation
+from pipeline.dag import cancel_on_timeout
+from transform.manifest import code_version, get_manifest
+from transform import validation
+
+# CONSTANTS
+CHUNKSIZE, N_GROUPS = 500_000, 12 * 24
+
+VALUE_COLUMNS = ['ghi_pyr', 'air_temperature', 'relative_humidity']
+OUTPUT_COLUMNS = {'ghi_pyr': 'GHI', 'air_temperature': 'Temperature', 'relative_humidity': 'Humidity'}
+
+def radiation_file(city: str, raw_dir: str | None = None) -> str:
+    raw_dir = raw_dir or Config.RAW_DATA_DIR
+    return os.path.join(raw_dir, "pakistan-solar-radiation-kaggle", f"{city}_complete_data.csv")
+
+def load_raw_weather(cities: list[str] = Config.CITIES, raw_dir: str | None = None) -> pd.DataFrame:
+    weather_dfs = []
+    for city in cities:
+        file_path = radiation_file(city, raw_dir)
+        if os.path.exists(file_path):
+            # Load only necessary columns to prevent memory overload
+            df = pd.read_csv(file_path, usecols=['time'] + VALUE_COLUMNS)
+            df['City'] = city.capitalize()
+            weather_dfs.append(df)
+
+    return pd.concat(weather_dfs, ignore_index=True) if weather_dfs else pd.DataFrame()
+
+def clean_weather(df_raw_weather: pd.DataFrame) -> pd.DataFrame:
+    """Drops impossible (GHI < 0) and incomplete readings, adds Hour and Month."""
+    # Remove physically impossible readings AND rows with any NaN sensor value
+    df = df_raw_weather[df_raw_weather['ghi_pyr'] >= 0].dropna()
+
+    df['time'] = pd.to_datetime(df['time'])
+    df['Hour'] = df['time'].dt.hour
+    df['Month'] = df['time'].dt.month
+    return df
+
+def aggregate_weather(df_weather_clean: pd.DataFrame) -> pd.DataFrame:
+    """Hourly means per City/Month/Hour, renamed to GHI/Temperature/Humidity."""
+    return (
+        df_weather_clean
+        .groupby(['City', 'Month', 'Hour'])[VALUE_COLUMNS]
+        .mean()
+        .reset_index()
+        .rename(columns=OUTPUT_COLUMNS)
+    )
+
+def transform_weather(output_path: str | None = None, force: bool = False) -> pd.DataFrame | None:
+    """In-memory weather stage; aggregate_solar_radiation is the out-of-core equivalent."""
+    output_path = output_path or os.path.join(Config.CLEANED_DATA_DIR, "cleaned_solar_radiation_by_city.csv")
+    manifest, code = get_manifest(), code_version(__file__, validation.__file__)
+    inputs = manifest.fingerprint([radiation_file(city) for city in Config.CITIES])
+    if not force and manifest.is_fresh(output_path, inputs, code):
+        print(f"{os.path.basename(output_path)} is up to date; skipping.")
+        instrumentation.log_event("up_to_date", path=output_path)
+        return None
+    df_raw = load_raw_weather()
+    if df_raw.empty:
+        print("No raw solar radiation data found.")
+        return df_raw
+
+    df = validation.quarantine_invalid("solar_radiation", aggregate_weather(clean_weather(df_raw)))
+    df.to_csv(output_path, index=False)
+    instrumentation.record_output(output_path, len(df))
+    manifest.record(output_path, inputs, code)
+    print(f"Weather aggregated: {len(df):,} rows -> {output_path}")
+    return df
+
+def accumulate_city(
+    file_path: str, chunksize: int = CHUNKSIZE, value_dtype: str = "float32"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Streams one city's 10-minute file into per-(Month, Hour) running sums.
+
+    Returns ``(sums, counts)`` with shapes ``(288, 3)`` and ``(288,)``, slot
+    ``(month - 1) * 24 + hour``. Rows are kept under the notebook's rule:
+    ``ghi_pyr >= 0`` and no missing value in any loaded column. Values are
+    parsed as ``value_dtype`` but summed in float64.
+    """
+    sums = np.zeros((N_GROUPS, len(VALUE_COLUMNS)))
+    counts = np.zeros(N_GROUPS, dtype=np.int64)
+
+    reader = pd.read_csv(
+        file_path,
+        usecols=['time'] + VALUE_COLUMNS,
+        dtype={c: value_dtype for c in VALUE_COLUMNS},
+        chunksize=chunksize,
+    )
+    for chunk in reader:
+        values = chunk[VALUE_COLUMNS].to_numpy()
+        time = pd.to_datetime(chunk['time'])
+        keep = (values[:, 0] >= 0) & ~np.isnan(values).any(axis=1) & time.notna().to_numpy()
+        if not keep.any():
+            continue
+
+        time = time[keep]
+        slot = (time.dt.month.to_numpy(dtype=np.int16) - 1) * 24 + time.dt.hour.to_numpy(dtype=np.int16)
+        kept = values[keep].astype(np.float64)
+        counts += np.bincount(slot, minlength=N_GROUPS)
+        for k in range(len(VALUE_COLUMNS)):
+            sums[:, k] += np.bincount(slot, weights=kept[:, k], minlength=N_GROUPS)
+
+    return sums, counts
+
+def _accumulate_city_task(args):
+    city, file_path, chunksize, value_dtype = args
+    return city, accumulate_city(file_path, chunksize, value_dtype)
+
+def aggregate_solar_radiation(
+    cities: list[str] = Config.CITIES,
+    raw_dir: str | None = None,
+    output_path: str | None = None,
+    chunksize: int = CHUNKSIZE,
+    max_workers: int | None = None,
+    value_dtype: str = "float32",
+    force: bool = False,
+) -> pd.DataFrame | None:
+    """Out-of-core replacement for the notebook's City/Month/Hour weather means.
+
+    Each city is streamed in ``chunksize`` rows on its own worker process, so
+    peak memory is one chunk per worker however large the files get. The
+    result has the columns and ordering of cleaned_solar_radiation_by_city.csv;
+    pass ``value_dtype="float64"`` to parse values exactly as the notebook did.
+    Written to ``output_path`` (default: the cleaned CSV) unless it is "", in
+    which case the build manifest is not consulted either. Returns None when
+    the output is up to date.
+    """
+    if output_path is None:
+        output_path = os.path.join(Config.CLEANED_DATA_DIR, "cleaned_solar_radiation_by_city.csv")
+    if output_path:
+        # The parse dtype changes the output, so it is part of the build's code version
+        manifest = get_manifest()
+        code = f"{code_version(__file__, validation.__file__)}-{value_dtype}"
+        inputs = manifest.fingerprint([radiation_file(city, raw_dir) for city in cities])
+        if not force and manifest.is_fresh(output_path, inputs, code):
+            print(f"{os.path.basename(output_path)} is up to date; skipping.")
+            instrumentation.log_event("up_to_date", path=output_path)
+            return None
+
+    tasks = [
+        (city, radiation_file(city, raw_dir), chunksize, value_dtype)
+        for city in cities
+        if os.path.exists(radiation_file(city, raw_dir))
+    ]
+    if not tasks:
+        print("No solar radiation files found.")
+        return pd.DataFrame(columns=['City', 'Month', 'Hour'] + list(OUTPUT_COLUMNS.values()))
+
+    max_workers = max_workers or min(len(tasks), os.cpu_count() or 1)
+    if max_workers > 1:
+        with cancel_on_timeout(ProcessPoolExecutor(max_workers)) as pool:
+            results = list(pool.map(_accumulate_city_task, tasks))
+    else:
+        results = [_accumulate_city_task(t) for t in tasks]
+
+    frames = []
+    slots = np.arange(N_GROUPS)
+    for city, (sums, counts) in results:
+        present = counts > 0
+        means = sums[present] / counts[present, None]
+        frame = pd.DataFrame(means, columns=list(OUTPUT_COLUMNS.values()))
+        frame.insert(0, 'City', city.capitalize())
+        frame.insert(1, 'Month', slots[present] // 24 + 1)
+        frame.insert(2, 'Hour', slots[present] % 24)
+        frames.append(frame)
+
+    df = pd.concat(frames, ignore_index=True).sort_values(['City', 'Month', 'Hour'], ignore_index=True)
+
+    if output_path:
+        df = validation.quarantine_invalid("solar_radiation", df)
+        df.to_csv(output_path, index=False)
+        instrumentation.record_output(output_path, len(df))
+        manifest.record(output_path, inputs, code)
+        print(f"Solar radiation aggregated from {len(tasks)} cities into {output_path}")
+    return df
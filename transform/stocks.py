@@ -0,0 +1,100 @@
+import os
+import glob
+import hashlib
+import pandas as pd
+from config.settings import Config
+from pipeline import instrumentation
+from transform.manifest import code_version, get_manifest, relative_path
+from transform import validation
+
+PRICE_COLS = ['Close', 'High', 'Low', 'Open', 'Volume']
+
+def _ticker_of(file: str) -> str:
+    return os.path.basename(file).split('_')[1]
+
+def raw_stock_files(stock_dir: str | None = None) -> list[str]:
+    stock_dir = stock_dir or os.path.join(Config.RAW_DATA_DIR, "yahoo_finance")
+    return sorted(glob.glob(os.path.join(stock_dir, "stock_*.csv")))
+
+def load_raw_stocks(stock_dir: str | None = None, files: list[str] | None = None) -> pd.DataFrame:
+    """Stacks every raw yfinance CSV (two-row headers, date index) into one long frame."""
+    files = raw_stock_files(stock_dir) if files is None else files
+    raw_stocks_list = []
+    for file in files:
+        ticker = _ticker_of(file)
+        df = pd.read_csv(file, header=[0, 1], index_col=0)
+        df.index.name = 'Date'
+        df.reset_index(inplace=True)
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        df['Ticker'] = ticker
+        raw_stocks_list.append(df)
+
+    return pd.concat(raw_stocks_list, ignore_index=True) if raw_stocks_list else pd.DataFrame()
+
+def clean_stocks(df_raw_stocks: pd.DataFrame) -> pd.DataFrame:
+    """Naive dates, per-ticker forward fill, then drops incomplete and duplicate rows."""
+    df = df_raw_stocks.copy()
+    df['Date'] = pd.to_datetime(df['Date'], utc=True).dt.tz_convert(None)
+
+    # ffill price/volume per-ticker only (not across ticker boundaries)
+    df[PRICE_COLS] = df.groupby('Ticker')[PRICE_COLS].ffill()
+    df.dropna(subset=PRICE_COLS, inplace=True)
+    df.drop_duplicates(inplace=True)
+    return df
+
+def _partition_hashes(files: list[str], inputs: dict[str, dict]) -> dict[str, str]:
+    """One hash per ticker over the hashes of all of its raw files."""
+    digests = {}
+    for file in files:
+        digest = digests.setdefault(_ticker_of(file), hashlib.sha256())
+        digest.update(inputs[relative_path(file)]["sha256"].encode())
+    return {ticker: d.hexdigest() for ticker, d in digests.items()}
+
+def transform_stocks(output_path: str | None = None, force: bool = False) -> pd.DataFrame | None:
+    """Rebuilds cleaned_stocks.csv, re-cleaning only tickers whose raw files changed.
+
+    Cleaning is per ticker (ffill never crosses tickers), so unchanged tickers
+    are taken from the existing output and merged with the re-cleaned ones in
+    raw file order. Returns None when nothing changed since the last build.
+    """
+    output_path = output_path or os.path.join(Config.CLEANED_DATA_DIR, "cleaned_stocks.csv")
+    files = raw_stock_files()
+    if not files:
+        print("No raw stock data found.")
+        return pd.DataFrame()
+
+    manifest, code = get_manifest(), code_version(__file__, validation.__file__)
+    inputs = manifest.fingerprint(files)
+    if not force and manifest.is_fresh(output_path, inputs, code):
+        print(f"{os.path.basename(output_path)} is up to date; skipping.")
+        instrumentation.log_event("up_to_date", path=output_path)
+        return None
+
+    partitions = _partition_hashes(files, inputs)
+    entry = manifest.entry(output_path)
+    reusable = not force and entry.get("code") == code and manifest.output_intact(output_path, entry)
+    previous = entry.get("partitions", {}) if reusable else {}
+    changed = [t for t in partitions if previous.get(t) != partitions[t]]
+    unchanged = [t for t in partitions if t not in changed]
+
+    frames = []
+    if unchanged:
+        kept = pd.read_csv(output_path, float_precision="round_trip")
+        kept = kept[kept['Ticker'].isin(unchanged)]
+        kept['Date'] = pd.to_datetime(kept['Date'], format="ISO8601")
+        frames.append(kept)
+    if changed:
+        # Kept tickers were validated when they were built; their quarantined rows stay quarantined
+        cleaned = clean_stocks(load_raw_stocks(files=[f for f in files if _ticker_of(f) in changed]))
+        frames.append(validation.quarantine_invalid(
+            "stocks", cleaned, keep_previous=lambda q: q['Ticker'].isin(unchanged)))
+
+    order = {ticker: i for i, ticker in enumerate(partitions)}
+    df = pd.concat(frames, ignore_index=True)
+    df = df.sort_values('Ticker', key=lambda t: t.map(order), kind='stable', ignore_index=True)
+    df.to_csv(output_path, index=False)
+    instrumentation.record_output(output_path, len(df))
+    manifest.record(output_path, inputs, code, partitions=partitions)
+    print(f"Stocks cleaned: {len(df):,} rows ({len(changed)} of {len(partitions)} tickers rebuilt) -> {output_path}")
+    return df
@@ -0,0 +1,233 @@
+import os
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field, replace
+from typing import Callable
+from config.settings import Config
+from pipeline import instrumentation
+
+# CONSTANTS
+VIOLATIONS_COLUMN, OHLC_TOLERANCE = "Violations", 1e-3
+KINDS = ("number", "integer", "datetime", "string")
+
+@dataclass(frozen=True)
+class Rule:
+    """A named row-level check: ``check(df)`` returns a boolean array, True for the rows that pass.
+
+    Checks must be vectorized over the whole frame. Null values pass every
+    rule except ``not_null``, so each rule reports one thing. A ``warn``
+    rule only counts the rows that fail it; they are not quarantined.
+    """
+    name: str
+    columns: tuple[str, ...]
+    check: Callable[[pd.DataFrame], np.ndarray]
+    warn: bool = False
+
+@dataclass
+class ValidationResult:
+    valid: pd.DataFrame
+    quarantined: pd.DataFrame
+    counts: dict[str, int] = field(default_factory=dict)
+    warnings: dict[str, int] = field(default_factory=dict)
+
+def _numeric(col: pd.Series) -> pd.Series:
+    return col if pd.api.types.is_numeric_dtype(col) else pd.to_numeric(col, errors="coerce")
+
+def _conforms(col: pd.Series, kind: str) -> np.ndarray:
+    if kind == "string":
+        return np.ones(len(col), dtype=bool)
+    if kind == "datetime":
+        if pd.api.types.is_datetime64_any_dtype(col):
+            return np.ones(len(col), dtype=bool)
+        parsed = pd.to_datetime(col, errors="coerce", format="ISO8601", utc=True)
+    else:
+        parsed = _numeric(col)
+        if kind == "integer" and not pd.api.types.is_integer_dtype(parsed):
+            parsed = parsed.where(parsed % 1 == 0)
+    return (parsed.notna() | col.isna()).to_numpy()
+
+def schema(**kinds: str) -> Rule:
+    """Each column holds values of its kind ("number", "integer", "datetime" or "string")."""
+    unknown = sorted(set(kinds.values()) - set(KINDS))
+    if unknown:
+        raise ValueError(f"Unknown column kind(s): {', '.join(unknown)}")
+
+    def check(df):
+        return np.logical_and.reduce([_conforms(df[c], kind) for c, kind in kinds.items()] or [np.ones(len(df), bool)])
+
+    return Rule("schema", tuple(kinds), check)
+
+def not_null(*columns: str) -> Rule:
+    return Rule(f"not_null({','.join(columns)})", columns, lambda df: df[list(columns)].notna().all(axis=1).to_numpy())
+
+def in_range(column: str, low: float | None = None, high: float | None = None, low_exclusive: bool = False) -> Rule:
+    """``low <= column <= high`` (``low < column`` with ``low_exclusive``); either bound may be None."""
+    def check(df):
+        values = _numeric(df[column])
+        ok = values.isna().to_numpy().copy()
+        inside = np.ones(len(values), dtype=bool)
+        if low is not None:
+            inside &= (values > low if low_exclusive else values >= low).to_numpy()
+        if high is not None:
+            inside &= (values <= high).to_numpy()
+        return ok | inside
+
+    bounds = f"{'(' if low_exclusive else '['}{'-inf' if low is None else low},{'inf' if high is None else high}]"
+    return Rule(f"{column} in {bounds}", (column,), check)
+
+def unique(*columns: str) -> Rule:
+    """No repeated key; the first occurrence passes, later ones fail."""
+    return Rule(f"unique({','.join(columns)})", columns, lambda df: (~df.duplicated(subset=list(columns))).to_numpy())
+
+def increasing_within(column: str, by: str | None = None) -> Rule:
+    """``column`` strictly increases down the frame (within each ``by`` group); the rows that break it fail."""
+    def check(df):
+        values = df[column]
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.to_datetime(values, errors="coerce", format="ISO8601", utc=True)
+        previous = values.groupby(df[by], sort=False, observed=True).shift() if by else values.shift()
+        return ((values > previous) | previous.isna() | values.isna()).to_numpy()
+
+    return Rule(f"increasing({column}{' by ' + by if by else ''})", (column,) + ((by,) if by else ()), check)
+
+def ohlc_consistent(open_: str = "Open", high: str = "High", low: str = "Low", close: str = "Close") -> Rule:
+    """Low <= Open, Close <= High, within 0.1% of High so adjusted-price rounding passes."""
+    def check(df):
+        o, h, l, c = (_numeric(df[col]).to_numpy(dtype=float) for col in (open_, high, low, close))
+        slack = OHLC_TOLERANCE * np.abs(h)
+        with np.errstate(invalid="ignore"):
+            ok = (l <= np.fmin(o, c) + slack) & (h >= np.fmax(o, c) - slack) & (l <= h + slack)
+        return ok | np.isnan(np.stack([o, h, l, c])).any(axis=0)
+
+    return Rule("ohlc_consistent", (open_, high, low, close), check)
+
+def warning(rule: Rule) -> Rule:
+    """``rule`` as warn-only: failing rows are counted and kept."""
+    return replace(rule, warn=True)
+
+def predicate(name: str, columns: tuple[str, ...], fn: Callable[[pd.DataFrame], pd.Series | np.ndarray]) -> Rule:
+    """Any other vectorized row predicate."""
+    return Rule(name, tuple(columns), lambda df: np.asarray(fn(df), dtype=bool))
+
+_PRICES = ("Close", "High", "Low", "Open")
+_COMMENT_RULES = (
+    schema(Comment_ID="string", Published_At="datetime", Like_Count="integer", Comment_Length="integer"),
+    not_null("Comment_ID", "Comment", "Published_At"),
+    unique("Comment_ID"),
+    in_range("Like_Count", 0),
+    in_range("Comment_Length", 0, low_exclusive=True),
+)
+
+# Rules per cleaned dataset, keyed by the names transforms pass to quarantine_invalid()
+DATASET_RULES: dict[str, tuple[Rule, ...]] = {
+    "stocks": (
+        schema(Date="datetime", Ticker="string", Volume="number", **{c: "number" for c in _PRICES}),
+        not_null("Date", "Ticker", *_PRICES, "Volume"),
+        *(in_range(c, 0, low_exclusive=True) for c in _PRICES),
+        in_range("Volume", 0),
+        # Yahoo rounds adjusted Opens independently of High/Low, so real days miss by more than the tolerance
+        warning(ohlc_consistent()),
+        increasing_within("Date", by="Ticker"),
+    ),
+    "pbs": (
+        schema(Fiscal_Year="integer", Total_Gen_GWh="number", Total_Cap_MW="number", Solar_Cap_MW="number"),
+        not_null("Fiscal_Year"),
+        unique("Fiscal_Year"),
+        *(in_range(c, 0) for c in ("Solar_Gen_GWh", "Total_Gen_GWh", "Solar_Cap_MW", "Total_Cap_MW")),
+        *(in_range(c, 0, 100) for c in ("Solar_Gen_Share_Pct", "Total_Utilization_Pct", "Solar_Utilization_Pct")),
+    ),
+    "solar_radiation": (
+        schema(City="string", Month="integer", Hour="integer", GHI="number", Temperature="number", Humidity="number"),
+        not_null("City", "Month", "Hour", "GHI"),
+        unique("City", "Month", "Hour"),
+        in_range("Month", 1, 12),
+        in_range("Hour", 0, 23),
+        in_range("GHI", 0),
+        in_range("Temperature", -60, 60),
+        in_range("Humidity", 0, 100),
+    ),
+    "solar_generation": (
+        schema(Date="datetime", Solar_Gen_GWh="number"),
+        not_null("Date", "Solar_Gen_GWh"),
+        in_range("Solar_Gen_GWh", 0),
+        increasing_within("Date"),
+    ),
+    "youtube": _COMMENT_RULES,
+    "youtube_deduped": _COMMENT_RULES + (in_range("Duplicate_Count", 1),),
+}
+
+def validate(df: pd.DataFrame, rules: tuple[Rule, ...]) -> ValidationResult:
+    """Evaluates every rule once over the whole frame and splits off the rows that fail any hard rule.
+
+    Quarantined rows keep their columns plus ``Violations``, the
+    ``;``-separated names of the rules they broke. Failures of warn-only
+    rules are only counted, in ``warnings``. A rule naming a column
+    the frame does not have raises ValueError: that is a schema change in
+    the transform, not a bad row.
+    """
+    missing = sorted({c for rule in rules for c in rule.columns} - set(df.columns))
+    if missing:
+        raise ValueError(f"Validation needs missing column(s): {', '.join(missing)}")
+
+    failed = np.zeros((len(df), len(rules)), dtype=bool)
+    for j, rule in enumerate(rules):
+        failed[:, j] = ~np.asarray(rule.check(df), dtype=bool)
+    hard = np.array([not rule.warn for rule in rules], dtype=bool)
+    bad = failed[:, hard].any(axis=1)
+    totals = failed.sum(axis=0)
+    counts = {rule.name: int(n) for rule, n in zip(rules, totals) if n and not rule.warn}
+    warnings = {rule.name: int(n) for rule, n in zip(rules, totals) if n and rule.warn}
+
+    quarantined = df[bad].copy()
+    labels = np.full(int(bad.sum()), "", dtype=object)
+    for j, rule in enumerate(rules):
+        if not rule.warn:
+            labels[failed[bad, j]] += ";" + rule.name
+    quarantined[VIOLATIONS_COLUMN] = [label[1:] for label in labels]
+    return ValidationResult(df[~bad], quarantined, counts, warnings)
+
+def quarantine_path(dataset: str) -> str:
+    return os.path.join(Config.QUARANTINE_DATA_DIR, f"{dataset}.csv")
+
+def quarantine_invalid(
+    dataset: str,
+    df: pd.DataFrame,
+    keep_previous: Callable[[pd.DataFrame], pd.Series] | None = None,
+) -> pd.DataFrame:
+    """Runs ``dataset``'s rules on a transform's output and returns only the rows that pass.
+
+    Failing rows replace ``data/quarantine/<dataset>.csv`` instead of
+    failing the stage; the file is removed once a build has none. For
+    incremental transforms, ``keep_previous`` selects rows of the existing
+    quarantine file that still stand (e.g. tickers that were not rebuilt).
+    Rows failing only warn-only rules are kept and reported.
+    """
+    result = validate(df, DATASET_RULES[dataset])
+    if result.warnings:
+        instrumentation.log_event("validation_warnings", dataset=dataset, rules=result.warnings)
+        summary = ", ".join(f"{name}: {n}" for name, n in result.warnings.items())
+        print(f"[validation] {dataset}: kept rows failing warn-only rules ({summary})")
+    path = quarantine_path(dataset)
+    # Rows carried over are kept as the text they were written as
+    previous = pd.DataFrame()
+    if keep_previous is not None and os.path.exists(path):
+        previous = pd.read_csv(path, dtype=str, keep_default_na=False)
+        previous = previous[keep_previous(previous)]
+
+    if previous.empty and result.quarantined.empty:
+        if os.path.exists(path):
+            os.remove(path)
+        return result.valid
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    previous.to_csv(tmp_path, index=False)
+    result.quarantined.to_csv(tmp_path, index=False, mode="a", header=previous.empty)
+    os.replace(tmp_path, path)
+    if result.counts:
+        instrumentation.count("rows_quarantined", len(result.quarantined))
+        instrumentation.log_event("quarantined", dataset=dataset, path=path,
+                                  rows=len(result.quarantined), rules=result.counts)
+        summary = ", ".join(f"{name}: {n}" for name, n in result.counts.items())
+        print(f"[validation] {dataset}: {len(result.quarantined):,} of {len(df):,} rows quarantined ({summary}) -> {path}")
+    return result.valid
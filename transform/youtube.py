@@ -0,0 +1,70 @@
+import os
+import html
+import pandas as pd
+from config.settings import Config
+from pipeline import instrumentation
+from extractload import comment_store
+from extractload.comment_store import iter_flattened_comments
+from transform.manifest import code_version, get_manifest
+from transform import validation
+
+MIN_COMMENT_LENGTH = 5
+
+def default_comments_path() -> str:
+    """The channel comments store: JSONL when it exists, else the legacy JSON dump."""
+    comments_dir = os.path.join(Config.RAW_DATA_DIR, "yt_comments")
+    jsonl_path = os.path.join(comments_dir, "matched_comments.jsonl")
+    return jsonl_path if os.path.exists(jsonl_path) else os.path.join(comments_dir, "matched_comments.json")
+
+def load_raw_youtube(path: str | None = None) -> pd.DataFrame:
+    path = path or default_comments_path()
+    parsed_comments = iter_flattened_comments(path) if os.path.exists(path) else []
+    return pd.DataFrame(parsed_comments)
+
+def unescape_comments(comments: pd.Series) -> pd.Series:
+    """html.unescape, called only on the rows that contain an entity at all."""
+    comments = comments.astype(str)
+    has_entity = comments.str.contains('&', regex=False)
+    if has_entity.any():
+        comments = comments.copy()
+        comments[has_entity] = comments[has_entity].map(html.unescape)
+    return comments
+
+def clean_youtube(df_raw_yt: pd.DataFrame) -> pd.DataFrame:
+    """Drops repeated Comment_IDs, unescapes HTML and filters comments of 5 chars or fewer."""
+    df = df_raw_yt.copy()
+    if 'Comment_Length_raw' not in df.columns:
+        df['Comment_Length_raw'] = df['Comment'].astype(str).str.len()
+
+    # Deduplicate paginated API overlaps
+    df.drop_duplicates(subset=['Comment_ID'], inplace=True)
+
+    # Strip HTML entities (e.g. &amp; &#39;) and encoding artefacts
+    df['Comment'] = unescape_comments(df['Comment'])
+
+    df['Published_At'] = pd.to_datetime(df['Published_At'])
+    df['Comment_Length'] = df['Comment'].str.len()
+    return df[df['Comment_Length'] > MIN_COMMENT_LENGTH]
+
+def transform_youtube(
+    path: str | None = None, output_path: str | None = None, force: bool = False
+) -> pd.DataFrame | None:
+    output_path = output_path or os.path.join(Config.CLEANED_DATA_DIR, "cleaned_youtube.csv")
+    path = path or default_comments_path()
+    manifest, code = get_manifest(), code_version(__file__, comment_store.__file__, validation.__file__)
+    inputs = manifest.fingerprint([path])
+    if not force and manifest.is_fresh(output_path, inputs, code):
+        print(f"{os.path.basename(output_path)} is up to date; skipping.")
+        instrumentation.log_event("up_to_date", path=output_path)
+        return None
+    df_raw = load_raw_youtube(path)
+    if df_raw.empty:
+        print("No raw YouTube comments found.")
+        return df_raw
+
+    df = validation.quarantine_invalid("youtube", clean_youtube(df_raw))
+    df.to_csv(output_path, index=False)
+    instrumentation.record_output(output_path, len(df))
+    manifest.record(output_path, inputs, code)
+    print(f"YouTube cleaned: {len(df):,} comments -> {output_path}")
+    return df